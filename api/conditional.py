@@ -0,0 +1,15 @@
+from typing import Optional
+from fastapi import Request, Response
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Weak comparison of the request's If-None-Match header against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not etag or not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
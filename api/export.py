@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List, Sequence
+from sqlalchemy import Select
+from core.serialization import dumps
+from services.database import AsyncSessionLocal
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def encode_ndjson(rows: Iterable[Sequence[Any]], fields: List[str]) -> bytes:
+    """One JSON object per row, newline terminated."""
+    return b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+
+def encode_csv(rows: Iterable[Sequence[Any]], fields: List[str], header: bool = False) -> str:
+    """CSV lines for the rows; JSON values such as raw_data are embedded as JSON text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(fields)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, default=_json_default) if isinstance(value, (dict, list))
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in row
+        ])
+    return buffer.getvalue()
+
+async def stream_export(statement: Select, fields: List[str], fmt: str, batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Stream the statement's rows through a server-side cursor, one encoded chunk per fetched batch.
+
+    Owns its session because the response body is produced after the request's
+    dependencies have been torn down.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=batch_size))
+        if fmt == "csv":
+            yield encode_csv([], fields, header=True).encode("utf-8")
+        async for partition in result.partitions():
+            if fmt == "csv":
+                yield encode_csv(partition, fields).encode("utf-8")
+            else:
+                yield encode_ndjson(partition, fields)
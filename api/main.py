@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from api.routes import router as api_router
 from core.config import settings
 from core.logging_config import setup_logging
-from services.database import init_db
+from services.database import init_db, async_engine
 from prometheus_fastapi_instrumentator import Instrumentator
 
 setup_logging()
@@ -18,6 +18,10 @@ def on_startup():
     
     init_db()
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await async_engine.dispose()
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
@@ -0,0 +1,51 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the (timestamp, id) position of a row."""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def encode_bucket_cursor(bucket: datetime, source: str) -> str:
+    """Opaque keyset cursor for the (bucket, source) position of a candle."""
+    raw = f"{bucket.isoformat()}|{source}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_bucket_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_bucket_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        bucket, source = raw.split("|", 1)
+        return datetime.fromisoformat(bucket), source
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+async def estimate_count(db: AsyncSession, query: Select) -> Optional[int]:
+    """
+    Approximate row count from the planner's statistics (EXPLAIN, not COUNT(*)),
+    so it costs the same however large the table is.
+    """
+    statement = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}"))).scalar()
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (TypeError, KeyError, IndexError):
+        return None
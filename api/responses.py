@@ -0,0 +1,13 @@
+from typing import Any
+from fastapi.responses import Response
+from core.serialization import dumps
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded directly with core.serialization, skipping response model
+    validation and jsonable_encoder. Only for content built from trusted rows.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,75 +1,313 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, and_, func, select, text, tuple_
 from typing import List, Optional
+from datetime import datetime
 import time
 import uuid
-from services.database import get_db, engine
-from schemas.models import APIResponse, UnifiedDataResponse, PaginationMetadata
-from schemas.database_models import UnifiedData
+from services.database import get_async_db
+from schemas.models import APIResponse, LatestQuoteResponse, OHLCVResponse, ConsensusResponse
+from schemas.database_models import RawData, UnifiedData, Job, LatestQuote, OHLCVRollup, ConsensusPrice
 from ingestion.orchestrator import Orchestrator
 from services.monitoring import get_metrics
+from services.cache import response_cache
+from services.run_lock import active_run_id
 from api.auth import get_api_key
+from api.pagination import encode_cursor, decode_cursor, encode_bucket_cursor, decode_bucket_cursor, estimate_count
+from api.export import EXPORT_MEDIA_TYPES, stream_export
+from api.responses import FastJSONResponse
+from api.conditional import etag_matches, not_modified
+from core.config import settings
 
 router = APIRouter(dependencies=[Depends(get_api_key)])
 
+DATA_FIELDS = ("id", "source", "original_id", "symbol", "price", "volume_24h", "market_cap", "timestamp", "created_at", "raw_data")
+DEFAULT_DATA_FIELDS = tuple(name for name in DATA_FIELDS if name != "raw_data")
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Resolve a comma-separated `fields` parameter into column names, in schema order.
+    """
+    if not fields:
+        return list(DEFAULT_DATA_FIELDS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(DATA_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in DATA_FIELDS if name in requested]
+
+def select_data(columns: List[str]) -> Select:
+    """
+    Select the named unified data columns. `raw_data` lives only in the raw_data table,
+    so it is outer-joined through the row's reference when, and only when, it is asked for.
+    """
+    query = select(*(RawData.data.label("raw_data") if name == "raw_data" else getattr(UnifiedData, name) for name in columns))
+    if "raw_data" in columns:
+        query = query.join_from(UnifiedData, RawData, and_(
+            RawData.id == UnifiedData.raw_data_id, RawData.ingested_at == UnifiedData.raw_ingested_at
+        ), isouter=True)
+    return query
+
 @router.post("/ingest", status_code=202)
-async def trigger_ingestion(background_tasks: BackgroundTasks):
+async def trigger_ingestion(background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
     """
-    Trigger the ingestion process in the background.
+    Trigger the ingestion process in the background, or join the run already in
+    progress: at most one run is active across all workers. Poll /runs/{run_id}.
     """
+    active = await active_run_id(db)
+    if active:
+        return {"message": "Ingestion already running", "run_id": active, "coalesced": True}
+
+    run_id = str(uuid.uuid4())
+    # Recorded before responding so /runs/{run_id} resolves at once; the run takes the row over
+    db.add(Job(run_id=run_id, status="Pending"))
+    await db.commit()
+    response_cache.invalidate()
     orchestrator = Orchestrator()
-    background_tasks.add_task(orchestrator.run)
-    return {"message": "Ingestion started in background"}
+    # If another trigger wins the run lock first, this run_id is recorded as coalesced into it
+    background_tasks.add_task(orchestrator.run, run_id=run_id)
+    return {"message": "Ingestion started in background", "run_id": run_id, "coalesced": False}
 
-@router.get("/data", response_model=APIResponse)
-def read_data(
+@router.get("/data", response_model=APIResponse, response_model_exclude_unset=True)
+async def read_data(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     symbol: Optional[str] = None, 
     source: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, pattern="^(exact|estimate|none)$"),
+    fields: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve unified data with pagination and filtering.
+
+    Pass `cursor` (the previous page's `next_cursor`) for keyset pagination, whose
+    cost does not grow with depth; `skip` is ignored then. `count` picks how `total`
+    is computed: exact COUNT(*) (default for skip paging), a planner estimate
+    (default for cursor paging) or none.
+
+    `fields` is a comma-separated list of columns to return; by default every column
+    except the `raw_data` payload is returned. `start` (inclusive) and `end` (exclusive)
+    bound `timestamp`, which lets Postgres skip monthly partitions outside the range.
+
+    Responses are cached until the next ingestion run finishes or the TTL expires.
+    The ETag changes with the data generation; a matching If-None-Match gets a 304
+    without a database round trip.
+    Rows come straight from the selected columns and are encoded without per-row
+    model validation; `APIResponse` documents the shape.
     """
     start_time = time.time()
     request_id = str(uuid.uuid4())
+
+    selected = parse_fields(fields)
+    params = {
+        "skip": skip, "limit": limit, "symbol": symbol, "source": source, "cursor": cursor,
+        "count": count, "fields": selected, "start": start, "end": end
+    }
+    etag = response_cache.etag("data", params)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag} if etag else None
+
+    cached = response_cache.get("data", params)
+    if cached is not None:
+        return FastJSONResponse({"request_id": request_id, "api_latency_ms": (time.time() - start_time) * 1000, **cached}, headers=headers)
     
-    query = db.query(UnifiedData)
+    # timestamp and id are always read because the next cursor is built from them
+    columns = list(dict.fromkeys(selected + ["timestamp", "id"]))
+    filters = []
     if symbol:
-        query = query.filter(UnifiedData.symbol == symbol)
+        filters.append(UnifiedData.symbol == symbol)
     if source:
-        query = query.filter(UnifiedData.source == source)
-    
-    total = query.count()
-    data = query.order_by(UnifiedData.timestamp.desc()).offset(skip).limit(limit).all()
+        filters.append(UnifiedData.source == source)
+    if start:
+        filters.append(UnifiedData.timestamp >= start)
+    if end:
+        filters.append(UnifiedData.timestamp < end)
+    query = select_data(columns).where(*filters)
+
+    count = count or ("estimate" if cursor else "exact")
+    total = None
+    # Counted without the raw_data join, which never changes the row count
+    counted = select(UnifiedData.id).where(*filters)
+    if count == "exact":
+        total = (await db.execute(select(func.count()).select_from(counted.subquery()))).scalar_one()
+    elif count == "estimate":
+        total = await estimate_count(db, counted)
+
+    page = query
+    if cursor:
+        try:
+            cursor_timestamp, cursor_id = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        page = page.where(tuple_(UnifiedData.timestamp, UnifiedData.id) < tuple_(cursor_timestamp, cursor_id))
+    page = page.order_by(UnifiedData.timestamp.desc(), UnifiedData.id.desc())
+    if not cursor:
+        page = page.offset(skip)
+    data = (await db.execute(page.limit(limit))).all()
+
+    next_cursor = encode_cursor(data[-1].timestamp, data[-1].id) if data and len(data) == limit else None
+
+    body = {
+        # The selected columns lead every row, in order
+        "data": [dict(zip(selected, row)) for row in data],
+        "meta": {
+            "total": total,
+            "total_is_estimate": count == "estimate",
+            "skip": 0 if cursor else skip,
+            "limit": limit,
+            "next_cursor": next_cursor
+        }
+    }
+    response_cache.set("data", params, body)
     
     latency = (time.time() - start_time) * 1000
     
-    return APIResponse(
-        request_id=request_id,
-        api_latency_ms=latency,
-        data=data,
-        meta=PaginationMetadata(total=total, skip=skip, limit=limit)
+    return FastJSONResponse({"request_id": request_id, "api_latency_ms": latency, **body}, headers=headers)
+
+@router.get("/data/export")
+async def export_data(
+    symbol: Optional[str] = None,
+    source: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = None
+):
+    """
+    Stream unified data for a symbol/source/time range as NDJSON or CSV, oldest first.
+
+    Rows are read through a server-side cursor and written as they arrive, so memory
+    use does not depend on the size of the export. `start` is inclusive, `end` exclusive.
+    """
+    selected = parse_fields(fields)
+    query = select_data(selected)
+    if symbol:
+        query = query.where(UnifiedData.symbol == symbol)
+    if source:
+        query = query.where(UnifiedData.source == source)
+    if start:
+        query = query.where(UnifiedData.timestamp >= start)
+    if end:
+        query = query.where(UnifiedData.timestamp < end)
+    query = query.order_by(UnifiedData.timestamp.asc(), UnifiedData.id.asc())
+
+    return StreamingResponse(
+        stream_export(query, selected, format, settings.EXPORT_BATCH_SIZE),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="unified_data.{format}"'}
     )
 
+@router.get("/data/aggregate", response_model=OHLCVResponse)
+async def aggregate_data(
+    symbol: str,
+    interval: str = Query("1h", pattern="^(1m|1h|1d)$"),
+    source: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Open/high/low/close/volume candles for a symbol, one per bucket and source, oldest first.
+
+    Served from the ohlcv_rollups table maintained during ingestion. `volume` is the
+    24h volume reported by the bucket's closing sample. When more than `limit` candles
+    match, `meta.truncated` is set and `meta.next_cursor` continues after the last one.
+    """
+    query = select(OHLCVRollup).where(OHLCVRollup.symbol == symbol, OHLCVRollup.resolution == interval)
+    if source:
+        query = query.where(OHLCVRollup.source == source)
+    if start:
+        query = query.where(OHLCVRollup.bucket >= start)
+    if end:
+        query = query.where(OHLCVRollup.bucket < end)
+    if cursor:
+        try:
+            cursor_bucket, cursor_source = decode_bucket_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(tuple_(OHLCVRollup.bucket, OHLCVRollup.source) > tuple_(cursor_bucket, cursor_source))
+    # One extra row tells whether the page was cut short
+    query = query.order_by(OHLCVRollup.bucket, OHLCVRollup.source).limit(limit + 1)
+    candles = (await db.scalars(query)).all()
+    truncated = len(candles) > limit
+    candles = candles[:limit]
+    return {
+        "data": candles,
+        "meta": {
+            "limit": limit,
+            "truncated": truncated,
+            "next_cursor": encode_bucket_cursor(candles[-1].bucket, candles[-1].source) if truncated else None
+        }
+    }
+
+@router.get("/latest", response_model=List[LatestQuoteResponse])
+async def read_latest(
+    symbol: Optional[str] = None,
+    source: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Current price of every symbol from each source, read from the latest_quotes table.
+    `symbol` accepts a comma-separated list.
+    """
+    query = select(LatestQuote)
+    if symbol:
+        query = query.where(LatestQuote.symbol.in_([name.strip() for name in symbol.split(",") if name.strip()]))
+    if source:
+        query = query.where(LatestQuote.source == source)
+    return (await db.scalars(query.order_by(LatestQuote.symbol, LatestQuote.source))).all()
+
+@router.get("/consensus", response_model=List[ConsensusResponse])
+async def read_consensus(symbol: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cross-source consensus per symbol: median, volume-weighted average and spread of
+    each source's latest price. Computed once per ingestion run, not per request.
+    `symbol` accepts a comma-separated list.
+    """
+    query = select(ConsensusPrice)
+    if symbol:
+        query = query.where(ConsensusPrice.symbol.in_([name.strip() for name in symbol.split(",") if name.strip()]))
+    return (await db.scalars(query.order_by(ConsensusPrice.symbol))).all()
+
 @router.get("/runs")
-def list_runs(limit: int = 10, db: Session = Depends(get_db)):
+async def list_runs(request: Request, response: Response, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
+    """
+    List recent ETL runs. Supports If-None-Match like /data.
+    """
+    etag = response_cache.etag("runs", {"limit": limit})
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if etag:
+        response.headers["ETag"] = etag
+    return (await db.scalars(select(Job).order_by(Job.start_time.desc()).limit(limit))).all()
+
+@router.get("/runs/{run_id}")
+async def read_run(run_id: str, db: AsyncSession = Depends(get_async_db)):
     """
-    List recent ETL runs.
+    Status of one run with live per-source progress. A trigger that was coalesced
+    into another run reports it under progress.coalesced_into.
     """
-    from schemas.database_models import Job
-    return db.query(Job).order_by(Job.start_time.desc()).limit(limit).all()
+    job = (await db.scalars(select(Job).where(Job.run_id == run_id))).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return job
 
 @router.get("/compare-runs")
-def compare_runs(run_id_1: str, run_id_2: str, db: Session = Depends(get_db)):
+async def compare_runs(run_id_1: str, run_id_2: str, db: AsyncSession = Depends(get_async_db)):
     """
     Compare statistics between two runs.
     """
-    from schemas.database_models import Job
-    job1 = db.query(Job).filter(Job.run_id == run_id_1).first()
-    job2 = db.query(Job).filter(Job.run_id == run_id_2).first()
+    job1 = (await db.scalars(select(Job).where(Job.run_id == run_id_1))).first()
+    job2 = (await db.scalars(select(Job).where(Job.run_id == run_id_2))).first()
     
     if not job1 or not job2:
         raise HTTPException(status_code=404, detail="One or both runs not found")
@@ -94,23 +332,27 @@ def compare_runs(run_id_1: str, run_id_2: str, db: Session = Depends(get_db)):
     }
 
 @router.get("/stats")
-def read_stats(limit: int = 10, db: Session = Depends(get_db)):
+async def read_stats(request: Request, response: Response, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
     """
-    Get ETL job history and statistics.
+    Get ETL job history and statistics. Supports If-None-Match like /data.
     """
-    from schemas.database_models import Job
-    jobs = db.query(Job).order_by(Job.start_time.desc()).limit(limit).all()
+    etag = response_cache.etag("stats", {"limit": limit})
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if etag:
+        response.headers["ETag"] = etag
+    jobs = (await db.scalars(select(Job).order_by(Job.start_time.desc()).limit(limit))).all()
     return jobs
 
 @router.get("/health")
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """
     Reports DB connectivity and ETL last-run status.
     """
     
     db_status = "connected"
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
     except Exception as e:
         import logging
         logging.getLogger(__name__).error(f"Health check DB error: {e}")
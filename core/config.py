@@ -15,7 +15,73 @@ class Settings(BaseSettings):
     COINPAPRIKA_API_KEY: str = Field(default="", description="Optional API Key for CoinPaprika")
     COINGECKO_API_KEY: str = Field(default="", description="Optional API Key for CoinGecko")
     COIN_IDS: list[str] = Field(default=["btc-bitcoin"], description="List of Coin IDs to fetch")
+    BATCH_TICKER_REQUESTS: bool = Field(default=True, description="Fetch all coins per provider in batched requests")
+    BATCH_TICKER_MIN_COINS: int = Field(default=2, description="Batch ticker requests only when COIN_IDS has at least this many coins")
+    COINGECKO_BATCH_SIZE: int = Field(default=50, description="Coin ids per CoinGecko simple/price request")
+    INGEST_MAX_CONCURRENCY: int = Field(default=8, description="Maximum number of sources fetched concurrently")
+    INGEST_PROVIDER_CONCURRENCY: dict[str, int] = Field(
+        default={"coinpaprika": 4, "coingecko": 2, "rss": 4, "csv": 1},
+        description="Per-provider cap on concurrently fetched sources"
+    )
+    PROVIDER_RATE_LIMITS: dict[str, dict[str, float]] = Field(
+        default={
+            "coinpaprika": {"rate": 10.0, "burst": 10, "max_concurrency": 8},
+            "coingecko": {"rate": 0.5, "burst": 5, "max_concurrency": 2},
+            "rss": {"rate": 20.0, "burst": 20, "max_concurrency": 16},
+            "default": {"rate": 5.0, "burst": 5, "max_concurrency": 4}
+        },
+        description="Per-provider token bucket (requests/second, burst) and concurrency ceiling"
+    )
+    RATE_LIMIT_LATENCY_TARGET_SECONDS: float = Field(default=2.0, description="Responses slower than this shrink concurrency")
+    RATE_LIMIT_DEFAULT_BACKOFF_SECONDS: float = Field(default=5.0, description="Pause after a 429 without Retry-After")
+    RATE_LIMIT_MAX_RETRIES: int = Field(default=3, description="Retries of a request answered with 429")
+    INGEST_BATCH_SIZE: int = Field(default=500, description="Rows written per database transaction")
+    HTTP_TIMEOUT_SECONDS: float = Field(default=10.0, description="Total timeout per outbound HTTP request")
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0, description="Connect timeout per outbound HTTP request")
+    HTTP_MAX_CONNECTIONS: int = Field(default=100, description="Pooled HTTP connections shared by all sources")
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = Field(default=10, description="Pooled HTTP connections per host")
+    HTTP_DNS_CACHE_TTL: int = Field(default=300, description="Seconds to cache DNS lookups")
+    CSV_FILES: list[str] = Field(default=["data/sample_data.csv"], description="CSV files to ingest")
+    CSV_CHUNKED_MIN_BYTES: int = Field(default=64 * 1024 * 1024, description="CSV files this large are parsed in parallel chunks")
+    CSV_CHUNK_BYTES: int = Field(default=8 * 1024 * 1024, description="Byte range parsed per CSV worker task")
+    CSV_PARSE_WORKERS: int = Field(default=4, description="Processes parsing large CSV files")
+    RSS_PARSE_WORKERS: int = Field(default=4, description="Threads parsing RSS feeds off the event loop")
+    INGEST_QUEUE_SIZE: int = Field(default=1000, description="Capacity of each queue between pipeline stages")
     
+    # Database pools: the API and ingestion each get their own engine
+    API_DB_POOL_SIZE: int = Field(default=10, description="Persistent connections in the API pool")
+    API_DB_MAX_OVERFLOW: int = Field(default=10, description="Extra API connections allowed under burst load")
+    API_DB_STATEMENT_TIMEOUT_MS: int = Field(default=5000, description="Postgres statement_timeout for API queries (0 disables)")
+    INGEST_DB_POOL_SIZE: int = Field(default=5, description="Persistent connections in the ingestion pool")
+    INGEST_DB_MAX_OVERFLOW: int = Field(default=5, description="Extra ingestion connections allowed under burst load")
+    INGEST_DB_STATEMENT_TIMEOUT_MS: int = Field(default=60000, description="Postgres statement_timeout for ingestion writes (0 disables)")
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30.0, description="How long a checkout waits for a free connection")
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800, description="Replace connections older than this")
+    DB_POOL_PRE_PING: bool = Field(default=True, description="Test connections on checkout and replace dead ones")
+
+    # Migrations
+    RUN_HEAVY_MIGRATIONS: bool = Field(default=False, description="Apply table-rewriting migrations at startup instead of refusing to start")
+
+    # Partitioning and retention (raw_data by ingested_at, unified_data by timestamp, monthly)
+    PARTITION_PREMAKE_MONTHS: int = Field(default=3, description="Monthly partitions created ahead of the current month")
+    RAW_DATA_RETENTION_MONTHS: int | None = Field(default=None, description="Drop raw_data partitions older than this many months; unset keeps everything")
+    UNIFIED_DATA_RETENTION_MONTHS: int | None = Field(default=None, description="Drop unified_data partitions older than this many months; unset keeps everything")
+
+    # Response cache
+    CACHE_ENABLED: bool = Field(default=True, description="Serve repeated /data queries from the response cache")
+    CACHE_BACKEND: str = Field(default="memory", description="memory (per worker) or redis (shared across workers)")
+    CACHE_REDIS_URL: str = Field(default="redis://localhost:6379/0", description="Redis URL when CACHE_BACKEND=redis")
+    CACHE_TTL_SECONDS: float = Field(default=30.0, description="Upper bound on how long a cached response is served")
+    CACHE_MAX_ENTRIES: int = Field(default=1024, description="Maximum responses held by the in-memory cache")
+    CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, description="Memory cap for the in-memory cache")
+
+    # Consensus
+    CONSENSUS_OUTLIER_THRESHOLD: float | None = Field(default=3.0, description="Reject quotes more than this many scaled MADs from the median; unset to disable")
+    CONSENSUS_MIN_SOURCES_FOR_OUTLIERS: int = Field(default=3, description="Sources needed before outlier rejection applies")
+
+    # Export
+    EXPORT_BATCH_SIZE: int = Field(default=5000, description="Rows fetched per server-side cursor round trip in /data/export")
+
     # Monitoring
     LOG_LEVEL: str = "INFO"
     
@@ -0,0 +1,11 @@
+import hashlib
+import json
+from typing import Any
+
+def content_hash(data: Any) -> str:
+    """
+    Stable SHA-256 of a JSON payload. Keys are sorted so logically identical
+    payloads hash the same regardless of key order.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,24 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional C-accelerated encoder; the stdlib fallback produces the same JSON
+    orjson = None
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def dumps(value: Any) -> bytes:
+    """Encode a value to compact UTF-8 JSON, with datetimes as ISO 8601 strings."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
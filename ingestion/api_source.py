@@ -1,15 +1,19 @@
 import aiohttp
 import asyncio
 import logging
+from datetime import datetime
 from typing import List, Dict, Any
 from ingestion.base import IngestionSource
+from ingestion.http_client import http_session, limited_get, is_transient_error
 from core.config import settings
 from services.monitoring import increment_error
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 
 logger = logging.getLogger(__name__)
 
 class CoinPaprikaSource(IngestionSource):
+    provider = "coinpaprika"
+
     def __init__(self, coin_id: str):
         self.coin_id = coin_id
         self.endpoint = f"{settings.COINPAPRIKA_API_URL}/tickers/{coin_id}"
@@ -18,21 +22,41 @@ class CoinPaprikaSource(IngestionSource):
         if settings.COINPAPRIKA_API_KEY:
             self.headers["Authorization"] = settings.COINPAPRIKA_API_KEY
 
+    def __str__(self):
+        return f"CoinPaprikaSource({self.coin_id})"
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(aiohttp.ClientError),
+        retry=retry_if_exception(is_transient_error),
         reraise=True
     )
-    async def _fetch_data(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
+    async def _fetch_data(self, session: aiohttp.ClientSession) -> Any:
         """
         Fetches data from the CoinPaprika API with retry logic.
-        Raises aiohttp.ClientError on non-200 status codes.
+        Throttling (429) is handled by the provider rate limiter; connection
+        errors, timeouts and 5xx responses are retried here. Raises
+        aiohttp.ClientError on non-200 status codes.
         """
-        async with session.get(self.endpoint, headers=self.headers) as response:
+        async with limited_get(session, self.provider, self.endpoint, headers=self.headers) as response:
             response.raise_for_status()  
             return await response.json()
 
+    @staticmethod
+    def _build_item(coin_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        last_updated = data.get("last_updated")
+        return {
+            "source": "coinpaprika",
+            "external_id": coin_id,
+            "data": data,
+            "checkpoint_id": f"coinpaprika:{coin_id}",
+            "cursor": datetime.strptime(last_updated, "%Y-%m-%dT%H:%M:%SZ") if last_updated else None
+        }
+
+    async def _fetch_items(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
+        data = await self._fetch_data(session)
+        return [self._build_item(self.coin_id, data)]
+
     async def ingest(self) -> List[Dict[str, Any]]:
         """
         Fetches ticker data for the specific coin.
@@ -40,14 +64,8 @@ class CoinPaprikaSource(IngestionSource):
         """
         results = []
         try:
-            async with aiohttp.ClientSession() as session:
-                data = await self._fetch_data(session)
-                
-                results.append({
-                    "source": "coinpaprika",
-                    "external_id": self.coin_id,
-                    "data": data
-                })
+            async with http_session(self.session) as session:
+                results = await self._fetch_items(session)
         except aiohttp.ClientResponseError as e:
             logger.error(f"CoinPaprika API request failed for {self.coin_id} (status: {e.status}): {e}")
             increment_error()
@@ -59,3 +77,30 @@ class CoinPaprikaSource(IngestionSource):
             increment_error()
         
         return results
+
+class CoinPaprikaBatchSource(CoinPaprikaSource):
+    """
+    Fetches every configured coin from the all-tickers endpoint in a single request
+    and fans the response out into one item per coin.
+    """
+
+    def __init__(self, coin_ids: List[str]):
+        super().__init__(",".join(coin_ids))
+        self.coin_ids = set(coin_ids)
+        self.endpoint = f"{settings.COINPAPRIKA_API_URL}/tickers"
+
+    def __str__(self):
+        return f"CoinPaprikaBatchSource({len(self.coin_ids)} coins)"
+
+    async def _fetch_items(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
+        tickers = await self._fetch_data(session)
+        results = [
+            self._build_item(ticker["id"], ticker)
+            for ticker in tickers
+            if ticker.get("id") in self.coin_ids
+        ]
+
+        missing = self.coin_ids - {item["external_id"] for item in results}
+        if missing:
+            logger.warning(f"No CoinPaprika tickers returned for {sorted(missing)}")
+        return results
@@ -1,11 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional
 
 class IngestionSource(ABC):
+    # Provider name used for per-provider concurrency limits
+    provider: str = "default"
+    # Checkpoint key for sources that resume as a whole (feeds, files)
+    checkpoint_id: Optional[str] = None
+    # Shared aiohttp session, bound by the orchestrator for the duration of a run
+    session: Optional[Any] = None
+
     @abstractmethod
     async def ingest(self) -> List[Dict[str, Any]]:
         """
         Fetch data from the source and return a list of raw data dictionaries.
         Each dict should have: source, external_id, data (JSON serializable).
+        Items may also carry checkpoint_id and cursor (a datetime or byte offset)
+        so the orchestrator can skip data that is not newer than the checkpoint.
+        """
+        pass
+
+    async def stream(self, since: Optional[Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield raw data dictionaries one at a time, in ascending cursor order.
+        Adapts ingest() by default; sources that can read incrementally override it
+        so large inputs never have to be held in memory. `since` is the stored
+        checkpoint for checkpoint_id, which sources may use to seek past old data.
+        """
+        for item in await self.ingest():
+            yield item
+
+    async def resume_from(self, since: Optional[Any]) -> Optional[Any]:
+        """
+        Vet the stored checkpoint before streaming. Sources whose checkpoint can go
+        stale, such as a file that was replaced, return None to start over.
+        """
+        return since
+
+    async def on_complete(self):
+        """
+        Called once every item this source produced in the run has been committed.
+        Sources use it to persist state that must not get ahead of the data.
         """
         pass
@@ -1,19 +1,26 @@
 import logging
-from typing import Dict, Any, List
-import requests
+from typing import Dict, Any, List, Tuple, AsyncIterator, Optional
 from datetime import datetime
 from ingestion.base import IngestionSource
-from tenacity import retry, stop_after_attempt, wait_exponential
+from ingestion.http_client import http_session, limited_get, is_transient_error
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+def parse_coin_id(coin_id: str) -> Tuple[str, str]:
+    """Split a CoinPaprika-style id like "btc-bitcoin" into (symbol, CoinGecko id)."""
+    parts = coin_id.split("-", 1)
+    symbol = parts[0].upper() if len(parts) > 0 else "UNKNOWN"
+    gecko_id = parts[1] if len(parts) > 1 else coin_id
+    return symbol, gecko_id
+
 class CoinGeckoSource(IngestionSource):
+    provider = "coingecko"
+
     def __init__(self, coin_id: str):
   
-        parts = coin_id.split("-", 1)
-        self.symbol = parts[0].upper() if len(parts) > 0 else "UNKNOWN" 
-        self.gecko_id = parts[1] if len(parts) > 1 else coin_id
+        self.symbol, self.gecko_id = parse_coin_id(coin_id)
         
         self.api_url = "https://api.coingecko.com/api/v3/simple/price"
         self.api_key = settings.COINGECKO_API_KEY
@@ -21,41 +28,95 @@ class CoinGeckoSource(IngestionSource):
     def __str__(self):
         return f"CoinGeckoSource({self.gecko_id})"
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception(is_transient_error),
+        reraise=True
+    )
+    async def _fetch_prices(self, gecko_ids: List[str]) -> Dict[str, Any]:
+        """
+        Fetch simple/price for one or more coins in a single request.
+        Returns a dict keyed by coin id e.g. {"bitcoin": {...}}.
+        Throttling (429) is handled by the provider rate limiter; connection
+        errors, timeouts and 5xx responses are retried here.
+        """
+        params = {
+            "ids": ",".join(gecko_ids),
+            "vs_currencies": "usd",
+            "include_market_cap": "true",
+            "include_24hr_vol": "true",
+            "include_last_updated_at": "true"
+        }
+        if self.api_key:
+            params["x_cg_demo_api_key"] = self.api_key
+
+        async with http_session(self.session) as session:
+            async with limited_get(session, self.provider, self.api_url, params=params) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    @staticmethod
+    def _build_item(gecko_id: str, symbol: str, coin_data: Dict[str, Any]) -> Dict[str, Any]:
+        coin_data["symbol_injected"] = symbol
+        last_updated_at = coin_data.get("last_updated_at")
+
+        return {
+            "source": "coingecko",
+            "external_id": gecko_id,
+            "data": coin_data,
+            "ingested_at": datetime.utcnow().isoformat(),
+            "checkpoint_id": f"coingecko:{gecko_id}",
+            "cursor": datetime.utcfromtimestamp(last_updated_at) if last_updated_at else None
+        }
+
     async def ingest(self) -> List[Dict[str, Any]]:
         try:
-            params = {
-                "ids": self.gecko_id,
-                "vs_currencies": "usd",
-                "include_market_cap": "true",
-                "include_24hr_vol": "true",
-                "include_last_updated_at": "true"
-            }
-            if self.api_key:
-                params["x_cg_demo_api_key"] = self.api_key
-
-            response = requests.get(
-                self.api_url,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = await self._fetch_prices([self.gecko_id])
             
-            # Simple price endpoint returns dict keyed by coin id e.g. {"bitcoin": {...}}
             if self.gecko_id not in data:
                 logger.warning(f"No data returned for {self.gecko_id}")
                 return []
 
-            coin_data = data[self.gecko_id]
-            coin_data["symbol_injected"] = self.symbol
-            
-            return [{
-                "source": "coingecko",
-                "external_id": self.gecko_id,
-                "data": coin_data,
-                "ingested_at": datetime.utcnow().isoformat()
-            }]
+            return [self._build_item(self.gecko_id, self.symbol, data[self.gecko_id])]
         except Exception as e:
             logger.error(f"Failed to fetch data from CoinGecko for {self.gecko_id}: {e}")
             raise e
+
+class CoinGeckoBatchSource(CoinGeckoSource):
+    """
+    Fetches many coins per simple/price request (chunked by chunk_size)
+    and fans the response out into one item per coin.
+    """
+
+    def __init__(self, coin_ids: List[str], chunk_size: Optional[int] = None):
+        self.coins: Dict[str, str] = {}
+        for coin_id in coin_ids:
+            symbol, gecko_id = parse_coin_id(coin_id)
+            self.coins[gecko_id] = symbol
+        self.chunk_size = chunk_size or settings.COINGECKO_BATCH_SIZE
+
+        self.api_url = "https://api.coingecko.com/api/v3/simple/price"
+        self.api_key = settings.COINGECKO_API_KEY
+
+    def __str__(self):
+        return f"CoinGeckoBatchSource({len(self.coins)} coins)"
+
+    async def ingest(self) -> List[Dict[str, Any]]:
+        return [item async for item in self.stream()]
+
+    async def stream(self, since: Optional[Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        gecko_ids = list(self.coins)
+        for start in range(0, len(gecko_ids), self.chunk_size):
+            chunk = gecko_ids[start:start + self.chunk_size]
+            try:
+                data = await self._fetch_prices(chunk)
+            except Exception as e:
+                logger.error(f"Failed to fetch data from CoinGecko for {chunk}: {e}")
+                raise e
+
+            for gecko_id in chunk:
+                if gecko_id not in data:
+                    logger.warning(f"No data returned for {gecko_id}")
+                    continue
+                yield self._build_item(gecko_id, self.coins[gecko_id], data[gecko_id])
@@ -0,0 +1,67 @@
+"""
+Byte-range CSV parsing for the CSV process pool. Only stdlib and core.hashing
+imports, so spawned workers start quickly. Chunk boundaries are line-aligned, so
+chunked mode assumes one record per line (no quoted newlines), which holds for
+tick exports.
+"""
+import csv
+import mmap
+import os
+from typing import List, Dict, Any, Optional, Tuple
+from core.hashing import content_hash
+
+def csv_item(row: Dict[str, str], offset: int, checkpoint_id: Optional[str]) -> Dict[str, Any]:
+    """
+    The ingestion item for one CSV row, shared by line and chunked reading so both
+    produce identical items. Values stay strings; _normalize converts them. The
+    content hash is computed here, in the reader's thread or worker process.
+    """
+    return {
+        "source": "csv",
+        "external_id": row.get("id") or row.get("symbol") or f"csv_row_{offset}",
+        "data": row,
+        "content_hash": content_hash(row),
+        "checkpoint_id": checkpoint_id,
+        "cursor": offset
+    }
+
+def plan_chunks(file_path: str, start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split [start, EOF) into byte ranges of roughly chunk_bytes that end on a newline."""
+    size = os.path.getsize(file_path)
+    if start >= size:
+        return []
+
+    chunks = []
+    with open(file_path, mode='rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < size:
+            end = min(pos + chunk_bytes, size)
+            if end < size:
+                newline = mm.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            chunks.append((pos, end))
+            pos = end
+    return chunks
+
+def parse_chunk(file_path: str, start: int, end: int, header: List[str], checkpoint_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Parse one byte range into finished ingestion items, so the parent process only
+    forwards them. Each item's cursor is the byte offset just past its row.
+    """
+    with open(file_path, mode='rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+
+    offsets = []
+    lines = []
+    pos = start
+    for line in data.splitlines(keepends=True):
+        pos += len(line)
+        if not line.strip():
+            continue
+        lines.append(line.decode('utf-8'))
+        offsets.append(pos)
+
+    return [
+        csv_item(dict(zip(header, values)), offset, checkpoint_id)
+        for offset, values in zip(offsets, csv.reader(lines))
+    ]
@@ -1,37 +1,153 @@
+import asyncio
 import csv
+import hashlib
 import logging
+import multiprocessing
 import os
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, BinaryIO, Optional
 from ingestion.base import IngestionSource
+from ingestion.csv_chunks import csv_item, plan_chunks, parse_chunk
+from core.config import settings
+from services.checkpoint import load_file_fingerprint, save_file_fingerprint
 from services.monitoring import increment_error
 
 logger = logging.getLogger(__name__)
 
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    # Spawned, not forked: the API process runs threads that a fork would copy mid-flight
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=settings.CSV_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parse_pool
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    SHA-256 of the header and first record. Appending rows leaves it unchanged;
+    replacing the file with different content does not.
+    """
+    with open(file_path, mode='rb') as f:
+        return hashlib.sha256(f.readline() + f.readline()).hexdigest()
+
 class CSVSource(IngestionSource):
-    def __init__(self, file_path: str):
+    provider = "csv"
+
+    def __init__(self, file_path: str, chunk_size: int = 1000):
         self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.checkpoint_id = f"csv:{file_path}"
+
+    def __str__(self):
+        return f"CSVSource({self.file_path})"
 
     async def ingest(self) -> List[Dict[str, Any]]:
-        results = []
+        return [item async for item in self.stream()]
+
+    async def resume_from(self, since: Optional[int]) -> Optional[int]:
+        """
+        Drop the byte-offset checkpoint when the file was truncated below it or
+        replaced by a different file, and record the file's current identity.
+        """
+        if not os.path.exists(self.file_path):
+            return since
+        fingerprint = await asyncio.to_thread(file_fingerprint, self.file_path)
+        stored = await asyncio.to_thread(load_file_fingerprint, self.checkpoint_id)
+        stale = isinstance(since, int) and (
+            since > os.path.getsize(self.file_path) or (stored is not None and stored != fingerprint)
+        )
+        if stale:
+            logger.warning(f"{self.file_path} was replaced or truncated, reading it from the start")
+        if stale or stored != fingerprint:
+            await asyncio.to_thread(save_file_fingerprint, self.checkpoint_id, fingerprint, stale)
+        return None if stale else since
+
+    async def stream(self, since: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield rows in chunks read off the event loop, keeping memory bounded by chunk_size.
+        Each row's cursor is the byte offset just past it, so a run resumes from `since`
+        by seeking instead of re-reading the file. Files of CSV_CHUNKED_MIN_BYTES or more
+        are parsed in parallel byte-range chunks instead.
+        """
         if not os.path.exists(self.file_path):
             logger.error(f"CSV file not found: {self.file_path}")
             increment_error()
-            return results
+            return
 
         try:
-            with open(self.file_path, mode='r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    
-                    external_id = row.get("id") or row.get("symbol") or f"csv_row_{reader.line_num}"
-                    
-                    results.append({
-                        "source": "csv",
-                        "external_id": external_id,
-                        "data": row
-                    })
+            if os.path.getsize(self.file_path) >= settings.CSV_CHUNKED_MIN_BYTES:
+                async for item in self._stream_chunked(since):
+                    yield item
+                return
+
+            with open(self.file_path, mode='rb') as f:
+                header = next(csv.reader([f.readline().decode('utf-8-sig')]), [])
+                if isinstance(since, int) and since > f.tell():
+                    f.seek(since)
+                while True:
+                    items = await asyncio.to_thread(self._read_chunk, f, header)
+                    if not items:
+                        break
+                    for item in items:
+                        yield item
         except Exception as e:
             logger.error(f"Error reading CSV {self.file_path}: {e}")
             increment_error()
-            
-        return results
+
+    def _read_chunk(self, f: BinaryIO, header: List[str]) -> List[Dict[str, Any]]:
+        items = []
+        while len(items) < self.chunk_size:
+            line = f.readline()
+            if not line:
+                break
+            # Quoted fields may span lines; keep reading until the quotes balance
+            while line.count(b'"') % 2:
+                more = f.readline()
+                if not more:
+                    break
+                line += more
+            if not line.strip():
+                continue
+
+            values = next(csv.reader([line.decode('utf-8')]))
+            items.append(csv_item(dict(zip(header, values)), f.tell(), self.checkpoint_id))
+        return items
+
+    async def _stream_chunked(self, since: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parse memory-mapped byte ranges in the process pool into finished items, hashed
+        there, and yield them in file order. At most two chunks per worker are in
+        flight, so memory stays bounded however large the file is.
+        """
+        with open(self.file_path, mode='rb') as f:
+            header = next(csv.reader([f.readline().decode('utf-8-sig')]), [])
+            start = f.tell()
+        if isinstance(since, int) and since > start:
+            start = since
+
+        chunks = await asyncio.to_thread(plan_chunks, self.file_path, start, settings.CSV_CHUNK_BYTES)
+        logger.info(f"Parsing {self.file_path} from byte {start} in {len(chunks)} chunks")
+
+        loop = asyncio.get_running_loop()
+        pool = _get_parse_pool()
+        max_in_flight = settings.CSV_PARSE_WORKERS * 2
+        pending = deque()
+        try:
+            for chunk_start, chunk_end in chunks:
+                pending.append(loop.run_in_executor(
+                    pool, parse_chunk, self.file_path, chunk_start, chunk_end, header, self.checkpoint_id
+                ))
+                if len(pending) >= max_in_flight:
+                    for item in await pending.popleft():
+                        yield item
+            while pending:
+                for item in await pending.popleft():
+                    yield item
+        finally:
+            for future in pending:
+                future.cancel()
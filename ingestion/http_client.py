@@ -0,0 +1,71 @@
+import aiohttp
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+from core.config import settings
+from ingestion.rate_limit import get_limiter, parse_retry_after
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Errors worth retrying: connection failures, timeouts and 5xx responses. 429s are
+    retried inside limited_get, other 4xx responses will not change on retry.
+    """
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status >= 500
+    return isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Build the pooled HTTP session shared by network sources. Connections are kept
+    alive across requests, capped globally and per host, and DNS lookups are cached.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_MAX_CONNECTIONS,
+        limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.HTTP_TIMEOUT_SECONDS,
+        connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+@asynccontextmanager
+async def http_session(shared: Optional[aiohttp.ClientSession] = None) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Yield the run's shared session, or a short-lived one when a source is used on its own.
+    """
+    if shared is not None and not shared.closed:
+        yield shared
+        return
+
+    async with create_http_session() as session:
+        yield session
+
+@asynccontextmanager
+async def limited_get(
+    session: aiohttp.ClientSession, provider: str, url: str, **kwargs: Any
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    """
+    GET through the provider's rate limiter. A 429 shrinks the provider's concurrency,
+    pauses its token bucket for Retry-After and is retried up to RATE_LIMIT_MAX_RETRIES
+    times; the last response is yielded as-is for the caller to handle. Only 2xx/3xx
+    responses count as successes for the adaptive concurrency limit.
+    """
+    limiter = get_limiter(provider)
+    attempt = 0
+    while True:
+        async with limiter.slot():
+            started = time.monotonic()
+            async with session.get(url, **kwargs) as response:
+                if response.status == 429:
+                    limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+                    if attempt < settings.RATE_LIMIT_MAX_RETRIES:
+                        attempt += 1
+                        continue
+                elif response.status < 400:
+                    # Errors say nothing about how much load the provider will take
+                    limiter.on_success(time.monotonic() - started)
+                yield response
+                return
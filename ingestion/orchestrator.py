@@ -1,31 +1,64 @@
 import asyncio
+import copy
 import logging
+import time
 import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert
 from ingestion.base import IngestionSource
-from ingestion.api_source import CoinPaprikaSource
-from ingestion.coingecko_source import CoinGeckoSource
+from ingestion.http_client import create_http_session
+from ingestion.api_source import CoinPaprikaSource, CoinPaprikaBatchSource
+from ingestion.coingecko_source import CoinGeckoSource, CoinGeckoBatchSource
 from ingestion.csv_source import CSVSource
 from ingestion.rss_source import RSSSource
 from core.config import settings
-from services.database import SessionLocal
-from schemas.database_models import RawData, UnifiedData, Job
-from services.checkpoint import load_checkpoint, save_checkpoint
+from services.database import SessionLocal, engine
+from services.run_lock import RunLock
+from services.partitions import ensure_partitions, ensure_upcoming_partitions, apply_retention
+from schemas.database_models import RawData, RawDataFingerprint, UnifiedData, Job
+from services.checkpoint import load_checkpoints, upsert_checkpoints
+from services.quotes import upsert_latest_quotes
+from services.rollups import upsert_rollups
+from services.consensus import refresh_consensus
+from services.cache import response_cache
 from services.monitoring import increment_ingested, increment_error, set_last_run_status
 from core.normalization import SymbolNormalizer
+from core.hashing import content_hash
 
 logger = logging.getLogger(__name__)
 
+# Outcomes of storing one item through the per-row fallback
+WRITTEN, DUPLICATE, RAW_ONLY, FAILED = "written", "duplicate", "raw_only", "failed"
+
+class _SourceComplete:
+    """Pipeline marker queued after the last item a source produced in this run."""
+
+    def __init__(self, source: IngestionSource):
+        self.source = source
+
 class Orchestrator:
+    # Minimum seconds between progress writes to the job row
+    PROGRESS_SAVE_INTERVAL = 1.0
+
     def __init__(self):
         self.sources: List[IngestionSource] = []
+        self._checkpoints: Dict[str, Any] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._progress_saved_at = 0.0
+        self._run_id: Optional[str] = None
+        # Checkpoints held back this run because one of their rows failed to store
+        self._stalled_checkpoints: Set[str] = set()
         self._setup_sources()
 
     def _setup_sources(self):
-        
-        for coin_id in settings.COIN_IDS:
-            self.sources.append(CoinPaprikaSource(coin_id))
+        # One all-tickers request only pays off over several per-coin requests
+        batch_tickers = settings.BATCH_TICKER_REQUESTS and len(settings.COIN_IDS) >= settings.BATCH_TICKER_MIN_COINS
+        if batch_tickers:
+            self.sources.append(CoinPaprikaBatchSource(settings.COIN_IDS))
+        else:
+            for coin_id in settings.COIN_IDS:
+                self.sources.append(CoinPaprikaSource(coin_id))
         
         
         
@@ -34,68 +67,308 @@ class Orchestrator:
             self.sources.append(RSSSource(url))
 
         
-        # CSV Source
-        self.sources.append(CSVSource("data/sample_data.csv"))
+        # CSV Sources
+        for file_path in settings.CSV_FILES:
+            self.sources.append(CSVSource(file_path))
         
         # CoinGecko Source
-        for coin_id in settings.COIN_IDS:
-             self.sources.append(CoinGeckoSource(coin_id))
+        if batch_tickers:
+            self.sources.append(CoinGeckoBatchSource(settings.COIN_IDS))
+        else:
+            for coin_id in settings.COIN_IDS:
+                 self.sources.append(CoinGeckoSource(coin_id))
+
+    async def run(self, simulate_failure: bool = False, run_id: Optional[str] = None):
+        """
+        Execute one ingestion run under the database-wide run lock. If another run
+        holds the lock, this trigger is recorded as coalesced into it and returns
+        without fetching anything.
+        """
+        run_id = run_id or str(uuid.uuid4())
+        lock = RunLock(engine)
+        if not await asyncio.to_thread(lock.acquire):
+            await asyncio.to_thread(self._record_coalesced, run_id)
+            return
+        try:
+            await self._run(run_id, simulate_failure)
+        finally:
+            await asyncio.to_thread(lock.release)
+
+    @staticmethod
+    def _claim_job(db, run_id: str) -> Job:
+        """The run's job row: the Pending one POST /ingest created, or a new one."""
+        job = db.query(Job).filter(Job.run_id == run_id).first()
+        if job is None:
+            job = Job(run_id=run_id)
+            db.add(job)
+        return job
+
+    def _record_coalesced(self, run_id: str):
+        db = SessionLocal()
+        try:
+            active = db.query(Job.run_id).filter(Job.status == "Running").order_by(Job.start_time.desc()).first()
+            active_run_id = active.run_id if active else None
+            job = self._claim_job(db, run_id)
+            job.status, job.end_time, job.progress = "Coalesced", datetime.utcnow(), {"coalesced_into": active_run_id}
+            db.commit()
+            # /runs and /stats list coalesced triggers too
+            response_cache.invalidate()
+            logger.info(f"Ingestion run {run_id} coalesced into active run {active_run_id}")
+        except Exception as e:
+            logger.error(f"Failed to record coalesced run {run_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
 
-    async def run(self, simulate_failure: bool = False):
-        run_id = str(uuid.uuid4())
+    async def _run(self, run_id: str, simulate_failure: bool):
+        self._run_id = run_id
         logger.info(f"Starting ingestion run {run_id}...")
         set_last_run_status("Running")
-        
+        self._progress = {str(source): {"status": "pending", "fetched": 0} for source in self.sources}
         
         db = SessionLocal()
-        job = Job(run_id=run_id, status="Running")
-        db.add(job)
+        # Holding the run lock means no other run is alive, so any 'Running' job was orphaned by a crash
+        db.query(Job).filter(Job.status == "Running").update({"status": "Failed", "end_time": datetime.utcnow()})
+        job = self._claim_job(db, run_id)
+        job.status, job.start_time, job.progress = "Running", datetime.utcnow(), self._progress
         db.commit()
         db.refresh(job) # Need ID if we want to update later, though we close DB here for the loop
         db.close()
+        # /runs and /stats now include this run
+        response_cache.invalidate()
         
-        items_processed = 0
-        error_count = 0
+        self._items_processed = 0
+        self._error_count = 0
+        self._stalled_checkpoints = set()
+        self._checkpoints = await asyncio.to_thread(load_checkpoints)
+        await asyncio.to_thread(ensure_upcoming_partitions, engine)
+
+        # Global cap plus one semaphore per provider, so a slow provider cannot hog every slot
+        limiter = asyncio.Semaphore(settings.INGEST_MAX_CONCURRENCY)
+        provider_limiters: Dict[str, asyncio.Semaphore] = {}
+        for source in self.sources:
+            if source.provider not in provider_limiters:
+                limit = settings.INGEST_PROVIDER_CONCURRENCY.get(source.provider, settings.INGEST_MAX_CONCURRENCY)
+                provider_limiters[source.provider] = asyncio.Semaphore(limit)
+
+        # fetch -> drift check/hash -> dedup/normalize/write, connected by bounded queues so
+        # memory stays flat and the writer drains while fetchers are still running
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+        prepared: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
 
         try:
-            for source in self.sources:
+            # One pooled HTTP session per run, shared by every network source
+            async with create_http_session() as session:
+                for source in self.sources:
+                    source.session = session
+
+                stages = [
+                    asyncio.create_task(self._fetch_stage(fetched, limiter, provider_limiters, simulate_failure)),
+                    asyncio.create_task(self._prepare_stage(fetched, prepared)),
+                    asyncio.create_task(self._write_stage(prepared, simulate_failure))
+                ]
                 try:
-                    if simulate_failure and items_processed > 0:
-                        raise Exception("Simulated Failure Injection")
+                    await asyncio.gather(*stages)
+                except Exception:
+                    for task in stages:
+                        task.cancel()
+                    await asyncio.gather(*stages, return_exceptions=True)
+                    raise
+                finally:
+                    for source in self.sources:
+                        source.session = None
+
+            symbols = await asyncio.to_thread(refresh_consensus)
+            logger.info(f"Consensus prices refreshed for {symbols} symbols")
+            # Runs hold the run lock, so retention never races another writer
+            await asyncio.to_thread(apply_retention, engine)
 
-                    raw_items = await source.ingest()
-                    if not raw_items:
-                        continue
-                    
-                    for item in raw_items:
-                        
-                        self._detect_schema_drift(item)
-                        
-                        # Process in thread pool to avoid blocking async loop with synchronous DB calls
-                        processed = await asyncio.to_thread(self._process_item_wrapper, item)
-                        
-                        if processed:
-                            items_processed += 1
-                    
-                    logger.info(f"Processed items from {source}")
-                except Exception as e:
-                    logger.error(f"Error processing source {source}: {e}")
-                    error_count += 1
-                    increment_error()
-                    if simulate_failure: 
-                         raise e
-            
             # Update job status in new session
-            self._update_job_status(run_id, "Completed", items_processed, error_count)
+            self._update_job_status(run_id, "Completed", self._items_processed, self._error_count)
             set_last_run_status("Completed")
         except Exception as e:
             logger.error(f"Critical error in orchestrator: {e}")
-            self._update_job_status(run_id, "Failed", items_processed, error_count)
+            self._update_job_status(run_id, "Failed", self._items_processed, self._error_count)
             set_last_run_status("Failed")
         finally:
+            # Batches commit as they go, so even a failed run may have changed what /data returns
+            response_cache.invalidate()
             logger.info(f"Ingestion run {run_id} finished.")
         logger.info(f"Ingestion run {run_id} completed.")
 
+    async def _fetch_stage(
+        self,
+        fetched: asyncio.Queue,
+        limiter: asyncio.Semaphore,
+        provider_limiters: Dict[str, asyncio.Semaphore],
+        simulate_failure: bool = False
+    ):
+        """Stream every source into the fetch queue, then signal end of input."""
+        await asyncio.gather(*[
+            self._fetch_source(source, fetched, limiter, provider_limiters[source.provider], simulate_failure)
+            for source in self.sources
+        ])
+        await fetched.put(None)
+
+    async def _fetch_source(
+        self,
+        source: IngestionSource,
+        fetched: asyncio.Queue,
+        limiter: asyncio.Semaphore,
+        provider_limiter: asyncio.Semaphore,
+        simulate_failure: bool = False
+    ):
+        """
+        Stream a single source into the fetch queue. Errors are isolated to the source
+        unless failure simulation is enabled, in which case they abort the run.
+        """
+        # Provider slot first so waiting on a busy provider does not hold a global slot
+        async with provider_limiter, limiter:
+            progress = self._progress.setdefault(str(source), {"status": "pending", "fetched": 0})
+            progress["status"] = "fetching"
+            try:
+                count = 0
+                skipped = 0
+                since = await source.resume_from(self._checkpoints.get(source.checkpoint_id))
+                if since is None:
+                    # Stale checkpoint: every item is new again
+                    self._checkpoints.pop(source.checkpoint_id, None)
+                async for item in source.stream(since=since):
+                    if not self._is_new(item):
+                        skipped += 1
+                        continue
+                    await fetched.put(item)
+                    count += 1
+                    progress["fetched"] = count
+
+                progress["status"] = "writing"
+                await fetched.put(_SourceComplete(source))
+                logger.info(f"Fetched {count} items from {source} ({skipped} already checkpointed)")
+            except Exception as e:
+                progress["status"] = "failed"
+                progress["error"] = str(e)
+                logger.error(f"Error processing source {source}: {e}")
+                self._error_count += 1
+                increment_error()
+                if simulate_failure:
+                    raise e
+
+    def _is_new(self, item: Dict[str, Any]) -> bool:
+        """An item is new unless its cursor is at or behind its stored checkpoint."""
+        cursor = item.get("cursor")
+        checkpoint = self._checkpoints.get(item.get("checkpoint_id"))
+        if cursor is None or checkpoint is None or type(cursor) is not type(checkpoint):
+            return True
+        return cursor > checkpoint
+
+    async def _prepare_stage(self, fetched: asyncio.Queue, prepared: asyncio.Queue):
+        """
+        Check fetched items for schema drift and stamp them with their content hash.
+        Items are taken in groups of up to INGEST_BATCH_SIZE and prepared in a worker
+        thread, so hashing never blocks the event loop (and the API requests on it).
+        Markers are forwarded after the items ahead of them.
+        """
+        while True:
+            batch, markers = [], []
+            item = await fetched.get()
+            while True:
+                if not isinstance(item, dict):
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= settings.INGEST_BATCH_SIZE or fetched.empty():
+                    break
+                item = fetched.get_nowait()
+
+            if batch:
+                await asyncio.to_thread(self._prepare_items, batch)
+                for item in batch:
+                    await prepared.put(item)
+            for marker in markers:
+                await prepared.put(marker)
+                if marker is None:
+                    return
+
+    def _prepare_items(self, items: List[Dict[str, Any]]):
+        for item in items:
+            self._detect_schema_drift(item)
+            # Sources may stamp the hash themselves, off the event loop
+            if "content_hash" not in item:
+                item["content_hash"] = content_hash(item["data"])
+
+    async def _write_stage(self, prepared: asyncio.Queue, simulate_failure: bool = False):
+        """
+        Drain the prepared queue in batches of up to INGEST_BATCH_SIZE. A batch is
+        flushed as soon as the queue runs dry so slow sources are not held back, and
+        before a source is marked complete so its completion hook follows its data.
+        With failure simulation, the run aborts once a source's items are committed
+        while other sources are still outstanding.
+        """
+        batch = []
+        outstanding = len(self.sources)
+        while True:
+            item = await prepared.get()
+            if isinstance(item, dict):
+                batch.append(item)
+                if len(batch) < settings.INGEST_BATCH_SIZE and not prepared.empty():
+                    continue
+
+            if batch:
+                # Write in thread pool to avoid blocking async loop with synchronous DB calls
+                self._items_processed += await asyncio.to_thread(self._write_batch, batch)
+                batch = []
+
+            if item is None:
+                return
+            if isinstance(item, _SourceComplete):
+                await self._complete_source(item.source)
+                outstanding -= 1
+                if simulate_failure and self._items_processed > 0 and outstanding > 0:
+                    self._error_count += 1
+                    increment_error()
+                    raise Exception("Simulated Failure Injection")
+            await self._save_progress()
+
+    async def _complete_source(self, source: IngestionSource):
+        try:
+            if source.checkpoint_id in self._stalled_checkpoints:
+                # Its state (e.g. feed validators) would hide the failed rows from the next run
+                logger.warning(f"Not completing {source}: some of its rows failed to store")
+            else:
+                await source.on_complete()
+        except Exception as e:
+            logger.error(f"Completion hook failed for {source}: {e}")
+        self._progress.setdefault(str(source), {"fetched": 0})["status"] = "done"
+
+    async def _save_progress(self):
+        """
+        Publish live progress to the job row and bump the response cache generation,
+        at most once per PROGRESS_SAVE_INTERVAL.
+        """
+        now = time.monotonic()
+        if now - self._progress_saved_at < self.PROGRESS_SAVE_INTERVAL:
+            return
+        self._progress_saved_at = now
+        # Snapshot: fetchers keep mutating the live dict while the thread serializes it
+        await asyncio.to_thread(
+            self._write_progress, self._run_id, copy.deepcopy(self._progress), self._items_processed, self._error_count
+        )
+
+    def _write_progress(self, run_id: str, progress: Dict[str, Any], items: int, errors: int):
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.run_id == run_id).update(
+                {"progress": progress, "items_processed": items, "error_count": errors}
+            )
+            db.commit()
+            # New progress and the batches committed since the last save change /runs, /stats and /data
+            response_cache.invalidate()
+        except Exception as e:
+            logger.warning(f"Failed to save progress of run {run_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
     def _detect_schema_drift(self, item: Dict[str, Any]):
         source = item["source"]
         data = item["data"]
@@ -121,7 +394,136 @@ class Orchestrator:
             if missing:
                 logger.warning(f"Schema Drift Detected for {source}: Missing keys {missing}")
 
-    def _process_item_wrapper(self, item: Dict[str, Any]) -> bool:
+    def _write_batch(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Persist a batch of items in a single transaction, together with the checkpoints
+        the batch advances. Payloads are deduplicated through raw_data_fingerprints on
+        (source, external_id, content_hash); only rows that were actually new are
+        stored in raw_data, normalized, written to
+        unified_data and folded into latest_quotes and the OHLCV rollups. If the batch fails, fall back to per-row inserts so only bad rows
+        are lost; checkpoints are then saved once the rows are in.
+        Returns the number of unified rows written.
+        """
+        ingested_at = datetime.utcnow()
+        raw_rows = {}
+        cursors: Dict[str, Any] = {}
+        for item in items:
+            self._advance_cursor(cursors, item)
+            key = (item["source"], item["external_id"], item["content_hash"])
+            raw_rows.setdefault(key, {
+                "source": item["source"],
+                "external_id": item["external_id"],
+                "data": item["data"],
+                "content_hash": item["content_hash"],
+                "ingested_at": ingested_at
+            })
+
+        unified_rows = []
+        batch_failed = False
+        ensure_partitions(engine, "raw_data", [ingested_at])
+        db = SessionLocal()
+        try:
+            stmt = insert(RawDataFingerprint).on_conflict_do_nothing().returning(
+                RawDataFingerprint.source, RawDataFingerprint.external_id, RawDataFingerprint.content_hash
+            )
+            inserted = db.execute(stmt, [
+                {"source": key[0], "external_id": key[1], "content_hash": key[2], "first_seen_at": ingested_at}
+                for key in raw_rows
+            ]).all()
+
+            # Duplicates short-circuit here: no raw row, no normalization, no unified row
+            raw_ids = {}
+            if inserted:
+                stored = db.execute(
+                    insert(RawData).returning(RawData.id, RawData.source, RawData.external_id, RawData.content_hash),
+                    [raw_rows[tuple(key)] for key in inserted]
+                ).all()
+                raw_ids = {(row.source, row.external_id, row.content_hash): row.id for row in stored}
+            for key in inserted:
+                row = raw_rows[tuple(key)]
+                unified_record = self._normalize(
+                    row["source"], row["external_id"], row["data"],
+                    raw_data_id=raw_ids.get(tuple(key)), raw_ingested_at=ingested_at
+                )
+                if unified_record:
+                    unified_rows.append(self._unified_row(unified_record, ingested_at))
+
+            if unified_rows:
+                ensure_partitions(engine, "unified_data", [row["timestamp"] for row in unified_rows])
+                db.execute(insert(UnifiedData), unified_rows)
+                upsert_latest_quotes(db, unified_rows)
+                upsert_rollups(db, unified_rows)
+            upsert_checkpoints(db, cursors)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Batch write of {len(items)} items failed, retrying row by row: {e}")
+            db.rollback()
+            batch_failed = True
+        finally:
+            db.close()
+
+        if batch_failed:
+            return self._write_rows(items)
+
+        duplicates = len(items) - len(inserted)
+        if duplicates:
+            logger.info(f"Skipped {duplicates} unchanged items")
+        for _ in unified_rows:
+            increment_ingested()
+        return len(unified_rows)
+
+    def _advance_cursor(self, cursors: Dict[str, Any], item: Dict[str, Any]):
+        checkpoint_id, cursor = item.get("checkpoint_id"), item.get("cursor")
+        if checkpoint_id and cursor is not None and checkpoint_id not in self._stalled_checkpoints:
+            cursors[checkpoint_id] = max(cursor, cursors.get(checkpoint_id, cursor))
+
+    def _write_rows(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Per-row fallback for a failed batch. A checkpoint only advances over the rows
+        before its first failure, and stays there for the rest of the run, so the
+        next run fetches the failed row again. Returns the number of unified rows written.
+        """
+        written = 0
+        cursors: Dict[str, Any] = {}
+        for item in items:
+            outcome = self._process_item_wrapper(item)
+            if outcome == FAILED:
+                if item.get("checkpoint_id"):
+                    self._stalled_checkpoints.add(item["checkpoint_id"])
+                continue
+            written += outcome == WRITTEN
+            self._advance_cursor(cursors, item)
+        self._save_cursors(cursors)
+        return written
+
+    def _save_cursors(self, cursors: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            upsert_checkpoints(db, cursors)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save checkpoints {list(cursors)}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _unified_row(record: UnifiedData, created_at: datetime) -> Dict[str, Any]:
+        """Column values of a normalized record, ready for a Core multi-row insert."""
+        return {
+            "source": record.source,
+            "original_id": record.original_id,
+            "symbol": record.symbol,
+            "price": record.price,
+            "volume_24h": record.volume_24h,
+            "market_cap": record.market_cap,
+            "timestamp": record.timestamp,
+            "created_at": created_at,
+            "raw_data_id": record.raw_data_id,
+            "raw_ingested_at": record.raw_ingested_at
+        }
+
+    def _process_item_wrapper(self, item: Dict[str, Any]) -> str:
         """Wrapper to handle session creation for each item processing."""
         db = SessionLocal()
         try:
@@ -129,36 +531,56 @@ class Orchestrator:
         except Exception as e:
             logger.error(f"Error in process_item: {e}")
             db.rollback()
-            return False
+            return FAILED
         finally:
             db.close()
 
-    def _process_item(self, db, item: Dict[str, Any]) -> bool:
+    def _process_item(self, db, item: Dict[str, Any]) -> str:
+        """
+        Store one item in a single transaction: fingerprint, raw row and the derived
+        rows commit together, so a failure leaves the payload unseen and a later run
+        retries it. Returns WRITTEN, DUPLICATE or RAW_ONLY (stored but not normalizable).
+        """
         source = item["source"]
-        # Allow multiple rows if IDs differ, but check if we already have this exact data?
-        # For now, just insert RawData. logic kept same, but normalization improved.
-        
         external_id = item["external_id"]
         data = item["data"]
+        ingested_at = datetime.utcnow()
+        payload_hash = item.get("content_hash") or content_hash(data)
+
+        is_new = db.execute(insert(RawDataFingerprint).values(
+            source=source,
+            external_id=external_id,
+            content_hash=payload_hash,
+            first_seen_at=ingested_at
+        ).on_conflict_do_nothing().returning(RawDataFingerprint.source)).first()
+        if is_new is None:
+            # Identical payload already stored
+            db.rollback()
+            return DUPLICATE
 
-        raw_record = RawData(
+        ensure_partitions(engine, "raw_data", [ingested_at])
+        raw_record = db.execute(insert(RawData).values(
             source=source,
             external_id=external_id,
             data=data,
-            ingested_at=datetime.utcnow()
-        )
-        db.add(raw_record)
-        db.commit() # Commit to get ID and ensure raw data is saved
+            content_hash=payload_hash,
+            ingested_at=ingested_at
+        ).returning(RawData.id)).first()
         
-        # Use raw_record.data in case DB added defaults or modified it (unlikely for JSONB but good practice)
-        unified_record = self._normalize(source, external_id, data, raw_record.data)
+        unified_record = self._normalize(source, external_id, data, raw_data_id=raw_record.id, raw_ingested_at=ingested_at)
         
         if unified_record:
+            ensure_partitions(engine, "unified_data", [unified_record.timestamp])
             db.add(unified_record)
+            unified_row = self._unified_row(unified_record, datetime.utcnow())
+            upsert_latest_quotes(db, [unified_row])
+            upsert_rollups(db, [unified_row])
             db.commit()
             increment_ingested()
-            return True
-        return False
+            return WRITTEN
+        # Payloads that cannot be normalized are still kept as raw data
+        db.commit()
+        return RAW_ONLY
 
     def _update_job_status(self, run_id: str, status: str, items: int, errors: int):
         db = SessionLocal()
@@ -168,6 +590,7 @@ class Orchestrator:
                 job.status = status
                 job.items_processed = items
                 job.error_count = errors
+                job.progress = copy.deepcopy(self._progress)
                 job.end_time = datetime.utcnow()
                 db.commit()
         except Exception as e:
@@ -175,7 +598,11 @@ class Orchestrator:
         finally:
             db.close()
 
-    def _normalize(self, source: str, external_id: str, data: Dict[str, Any], raw_data: Any) -> UnifiedData:
+    def _normalize(
+        self, source: str, external_id: str, data: Dict[str, Any],
+        raw_data_id: Optional[int] = None, raw_ingested_at: Optional[datetime] = None
+    ) -> UnifiedData:
+        """Map a source payload onto UnifiedData, linked to its raw_data row rather than copying it."""
         try:
             # Common extraction
             symbol_raw = None
@@ -247,7 +674,8 @@ class Orchestrator:
                 volume_24h=volume_val,
                 market_cap=market_cap_val,
                 timestamp=timestamp_val,
-                raw_data=raw_data
+                raw_data_id=raw_data_id,
+                raw_ingested_at=raw_ingested_at
             )
         except Exception as e:
             logger.error(f"Normalization error for {source} {external_id}: {e}")
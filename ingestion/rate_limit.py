@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Smooths requests to `rate` per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds`, e.g. to honor Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency window: grows by roughly one slot per window of healthy
+    responses, shrinks a little on slow responses and halves on throttling.
+    """
+
+    def __init__(self, maximum: int, latency_target: float):
+        self.maximum = max(1, maximum)
+        self.latency_target = latency_target
+        self.limit = max(1.0, self.maximum / 2)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float):
+        if latency <= self.latency_target:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        else:
+            self.limit = max(1.0, self.limit * 0.9)
+
+    def on_throttle(self):
+        self.limit = max(1.0, self.limit / 2)
+
+class ProviderLimiter:
+    def __init__(self, provider: str, rate: float, burst: float, max_concurrency: int):
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(max_concurrency, settings.RATE_LIMIT_LATENCY_TARGET_SECONDS)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+            yield
+        finally:
+            await self.concurrency.release()
+
+    def on_success(self, latency: float):
+        self.concurrency.on_success(latency)
+
+    def on_throttle(self, retry_after: Optional[float]):
+        delay = retry_after if retry_after is not None else settings.RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+        self.concurrency.on_throttle()
+        self.bucket.pause(delay)
+        logger.warning(
+            f"Throttled by {self.provider}: pausing {delay:.1f}s, concurrency now {int(self.concurrency.limit)}"
+        )
+
+# Limiters hold asyncio primitives, so they are kept per event loop
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ProviderLimiter]]" = weakref.WeakKeyDictionary()
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Return the process-wide limiter for a provider, creating it from settings on first use."""
+    limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+    if provider not in limiters:
+        config = settings.PROVIDER_RATE_LIMITS.get(provider, settings.PROVIDER_RATE_LIMITS["default"])
+        limiters[provider] = ProviderLimiter(
+            provider,
+            rate=config["rate"],
+            burst=config.get("burst", config["rate"]),
+            max_concurrency=int(config.get("max_concurrency", 4))
+        )
+    return limiters[provider]
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
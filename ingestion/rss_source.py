@@ -1,49 +1,111 @@
+import asyncio
 import feedparser
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from datetime import datetime
 from ingestion.base import IngestionSource
+from ingestion.http_client import http_session, limited_get
+from core.config import settings
+from services.checkpoint import load_feed_validators, save_feed_validators
 from services.monitoring import increment_error
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool so feed parsing never competes with DB writes for default executor threads
+_parse_pool = ThreadPoolExecutor(max_workers=settings.RSS_PARSE_WORKERS, thread_name_prefix="rss-parse")
+
+def parse_feed(body: bytes, content_type: Optional[str], checkpoint_id: str) -> List[Dict[str, Any]]:
+    """
+    Parse a downloaded feed into raw items, oldest first.
+    Raises ValueError if the feed is malformed.
+    """
+    feed = feedparser.parse(body, response_headers={"content-type": content_type or ""})
+    if feed.bozo:
+        raise ValueError(f"Error parsing RSS feed: {feed.bozo_exception}")
+
+    results = []
+    for entry in feed.entries:
+        
+        external_id = entry.get("link") or entry.get("id")
+        
+        
+        
+        entry_data = {
+            "title": entry.get("title"),
+            "link": entry.get("link"),
+            "summary": entry.get("summary"),
+            "description": entry.get("description"),
+            "published": entry.get("published"),
+            "published_parsed": entry.get("published_parsed"), 
+            "author": entry.get("author"),
+            "tags": [t.term for t in entry.get("tags", [])]
+        }
+
+        published_parsed = entry.get("published_parsed")
+        results.append({
+            "source": "rss",
+            "external_id": external_id,
+            "data": entry_data,
+            "checkpoint_id": checkpoint_id,
+            "cursor": datetime(*published_parsed[:6]) if published_parsed else None
+        })
+
+    # Oldest first, so a checkpoint committed mid-feed never skips older entries
+    results.sort(key=lambda item: item["cursor"] or datetime.min)
+    return results
+
 class RSSSource(IngestionSource):
+    provider = "rss"
+
     def __init__(self, feed_url: str):
         self.feed_url = feed_url
+        self.checkpoint_id = f"rss:{feed_url}"
+        self._validators: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+    def __str__(self):
+        return f"RSSSource({self.feed_url})"
 
     async def ingest(self) -> List[Dict[str, Any]]:
-        results = []
+        return [item async for item in self.stream()]
+
+    async def stream(self, since: Optional[Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Conditionally fetch the feed using its stored ETag/Last-Modified, so an
+        unchanged feed costs a single 304, then parse it in the worker pool.
+        """
+        self._validators = None
         try:
-            feed = feedparser.parse(self.feed_url)
-            if feed.bozo:
-                logger.error(f"Error parsing RSS feed {self.feed_url}: {feed.bozo_exception}")
-                increment_error()
-                return results
-
-            for entry in feed.entries:
-                
-                external_id = entry.get("link") or entry.get("id")
-                
-                
-                
-                entry_data = {
-                    "title": entry.get("title"),
-                    "link": entry.get("link"),
-                    "summary": entry.get("summary"),
-                    "description": entry.get("description"),
-                    "published": entry.get("published"),
-                    "published_parsed": entry.get("published_parsed"), 
-                    "author": entry.get("author"),
-                    "tags": [t.term for t in entry.get("tags", [])]
-                }
-
-                results.append({
-                    "source": "rss",
-                    "external_id": external_id,
-                    "data": entry_data
-                })
+            etag, last_modified = await asyncio.to_thread(load_feed_validators, self.checkpoint_id)
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+            async with http_session(self.session) as session:
+                async with limited_get(session, self.provider, self.feed_url, headers=headers) as response:
+                    if response.status == 304:
+                        logger.info(f"RSS feed {self.feed_url} not modified")
+                        return
+                    response.raise_for_status()
+                    body = await response.read()
+                    content_type = response.headers.get("Content-Type")
+                    validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(_parse_pool, parse_feed, body, content_type, self.checkpoint_id)
         except Exception as e:
             logger.error(f"Error ingesting from RSS {self.feed_url}: {e}")
             increment_error()
-            
-        return results
+            return
+
+        # Saved in on_complete, once the entries are committed
+        self._validators = validators
+        for item in results:
+            yield item
+
+    async def on_complete(self):
+        if self._validators and any(self._validators):
+            await asyncio.to_thread(save_feed_validators, self.checkpoint_id, *self._validators)
+        self._validators = None
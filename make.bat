@@ -3,6 +3,8 @@ if "%1"=="up" goto up
 if "%1"=="down" goto down
 if "%1"=="test" goto test
 if "%1"=="clean" goto clean
+if "%1"=="bench" goto bench
+if "%1"=="migrate" goto migrate
 goto help
 
 :up
@@ -17,6 +19,18 @@ goto end
 docker-compose run --rm app pytest
 goto end
 
+:bench
+docker-compose up -d db
+docker-compose exec -T db dropdb -U user --if-exists ingestion_bench
+docker-compose exec -T db createdb -U user ingestion_bench
+docker-compose run --rm app python scripts/benchmark_data_queries.py --database-url postgresql://user:password@db:5432/ingestion_bench
+docker-compose exec -T db dropdb -U user ingestion_bench
+goto end
+
+:migrate
+docker-compose run --rm app python scripts/migrate.py
+goto end
+
 :clean
 docker-compose down -v
 echo Cleaning pycache...
@@ -24,7 +38,7 @@ for /d /r . %%d in (__pycache__) do @if exist "%%d" rd /s /q "%%d"
 goto end
 
 :help
-echo Usage: make [up|down|test|clean]
+echo Usage: make [up|down|test|bench|migrate|clean]
 goto end
 
 :end
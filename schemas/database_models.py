@@ -1,37 +1,120 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Index, DDL, event
 from sqlalchemy.dialects.postgresql import JSONB
 from services.database import Base
+from services.partitions import default_partition_ddl
 from datetime import datetime
 
 class RawData(Base):
+    """Partitioned by month of ingested_at; see services/partitions.py."""
     __tablename__ = "raw_data"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     source = Column(String, index=True) 
     external_id = Column(String, index=True) 
     data = Column(JSONB) 
-    ingested_at = Column(DateTime, default=datetime.utcnow)
+    content_hash = Column(String(64), nullable=True) # SHA-256 of data, see core.hashing
+    # Partition key, so it is part of the primary key
+    ingested_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (ingested_at)"}
+
+class RawDataFingerprint(Base):
+    """
+    Payloads already stored in raw_data. Dedup lives here because a unique index on
+    the partitioned raw_data would have to include ingested_at.
+    """
+    __tablename__ = "raw_data_fingerprints"
+
+    source = Column(String, primary_key=True)
+    external_id = Column(String, primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
 
 class UnifiedData(Base):
+    """Partitioned by month of timestamp, so time-bounded queries prune partitions."""
     __tablename__ = "unified_data"
+    __table_args__ = {"postgresql_partition_by": "RANGE (timestamp)"}
 
-    id = Column(Integer, primary_key=True, index=True)
-    source = Column(String, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    source = Column(String)
     original_id = Column(String, index=True)
     symbol = Column(String, nullable=True)
     price = Column(Float, nullable=True)
     volume_24h = Column(Float, nullable=True)
     market_cap = Column(Float, nullable=True)
-    timestamp = Column(DateTime, index=True) 
+    timestamp = Column(DateTime, primary_key=True) # Partition key
     created_at = Column(DateTime, default=datetime.utcnow)
-    raw_data = Column(JSONB) 
+    # The raw_data row this was normalized from: its id plus its partition key, so the
+    # lookup hits one partition. Not a database FK, which would stop retention from
+    # dropping raw_data partitions.
+    raw_data_id = Column(Integer, nullable=True)
+    raw_ingested_at = Column(DateTime, nullable=True)
+
+# /data filters by symbol and/or source and pages by (timestamp, id) descending.
+# Existing databases get these through services/migrations.py.
+Index("ix_unified_data_symbol_timestamp", UnifiedData.symbol, UnifiedData.timestamp.desc(), UnifiedData.id.desc())
+Index("ix_unified_data_source_timestamp", UnifiedData.source, UnifiedData.timestamp.desc(), UnifiedData.id.desc())
+Index("ix_unified_data_timestamp_id", UnifiedData.timestamp.desc(), UnifiedData.id.desc())
+
+for _table in (RawData.__table__, UnifiedData.__table__):
+    event.listen(_table, "after_create", DDL(default_partition_ddl(_table.name)).execute_if(dialect="postgresql"))
+
+class LatestQuote(Base):
+    """Newest unified row per (symbol, source), maintained by the ingestion write path."""
+    __tablename__ = "latest_quotes"
+
+    symbol = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    original_id = Column(String)
+    price = Column(Float, nullable=True)
+    volume_24h = Column(Float, nullable=True)
+    market_cap = Column(Float, nullable=True)
+    timestamp = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ConsensusPrice(Base):
+    """Cross-source consensus per symbol, recomputed from latest_quotes once per ingestion run."""
+    __tablename__ = "consensus_prices"
+
+    symbol = Column(String, primary_key=True)
+    median_price = Column(Float)
+    vwap = Column(Float, nullable=True)
+    spread = Column(Float)
+    spread_pct = Column(Float, nullable=True)
+    sources = Column(JSONB) # Sources that contributed
+    rejected_sources = Column(JSONB) # Sources dropped as outliers
+    timestamp = Column(DateTime) # Newest contributing quote
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class OHLCVRollup(Base):
+    """
+    Candle per (symbol, resolution, bucket, source), updated incrementally by the
+    ingestion write path. Key order serves symbol + resolution + bucket range reads.
+    """
+    __tablename__ = "ohlcv_rollups"
+
+    symbol = Column(String, primary_key=True)
+    resolution = Column(String, primary_key=True) # 1m, 1h or 1d
+    bucket = Column(DateTime, primary_key=True)
+    source = Column(String, primary_key=True)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float, nullable=True) # volume_24h of the closing sample
+    open_time = Column(DateTime)
+    close_time = Column(DateTime)
+    sample_count = Column(Integer, default=0)
 
 class Checkpoint(Base):
     __tablename__ = "checkpoints"
 
     source_id = Column(String, primary_key=True, index=True)
     last_ingested_at = Column(DateTime, default=datetime.utcnow)
+    last_offset = Column(BigInteger, nullable=True) # Byte offset for file sources
+    file_fingerprint = Column(String(64), nullable=True) # Identity of the file last_offset points into
+    etag = Column(String, nullable=True) # HTTP validators for conditional feed requests
+    last_modified = Column(String, nullable=True)
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -43,3 +126,4 @@ class Job(Base):
     status = Column(String, default="Running") 
     items_processed = Column(Integer, default=0)
     error_count = Column(Integer, default=0)
+    progress = Column(JSONB, nullable=True) # Per-source status while running; coalesced_into for skipped triggers
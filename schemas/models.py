@@ -40,13 +40,83 @@ class UnifiedDataResponse(UnifiedDataCreate):
         from_attributes = True
 
 
+class UnifiedDataFields(BaseModel):
+    """A unified data row restricted to the requested fields; the rest stay unset."""
+    id: Optional[int] = None
+    source: Optional[str] = None
+    original_id: Optional[str] = None
+    symbol: Optional[str] = None
+    price: Optional[float] = None
+    volume_24h: Optional[float] = None
+    market_cap: Optional[float] = None
+    timestamp: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    raw_data: Optional[Dict[str, Any]] = None
+
+
+class LatestQuoteResponse(BaseModel):
+    symbol: str
+    source: str
+    original_id: Optional[str] = None
+    price: Optional[float] = None
+    volume_24h: Optional[float] = None
+    market_cap: Optional[float] = None
+    timestamp: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class OHLCVBucket(BaseModel):
+    bucket: datetime
+    source: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: Optional[float] = None
+    sample_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class OHLCVMetadata(BaseModel):
+    limit: int
+    truncated: bool
+    next_cursor: Optional[str] = None
+
+class OHLCVResponse(BaseModel):
+    """Candles oldest first; when `truncated`, pass `next_cursor` back as `cursor` for the rest."""
+    data: List[OHLCVBucket]
+    meta: OHLCVMetadata
+
+
+class ConsensusResponse(BaseModel):
+    symbol: str
+    median_price: float
+    vwap: Optional[float] = None
+    spread: float
+    spread_pct: Optional[float] = None
+    sources: List[str]
+    rejected_sources: List[str]
+    timestamp: datetime
+    computed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class PaginationMetadata(BaseModel):
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 class APIResponse(BaseModel):
     request_id: str
     api_latency_ms: float
-    data: List[UnifiedDataResponse]
+    data: List[UnifiedDataFields]
     meta: PaginationMetadata
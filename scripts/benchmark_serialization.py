@@ -0,0 +1,64 @@
+"""
+Compare the cost of encoding a /data page through the pydantic path (model
+validation + jsonable_encoder + json) with the fast path used by read_data
+(rows zipped from DB tuples and encoded by core.serialization).
+
+Usage: python scripts/benchmark_serialization.py [--rows 100 1000] [--repeat 50]
+No database is needed; rows are synthetic.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.append(os.getcwd())
+
+from fastapi.encoders import jsonable_encoder
+from core import serialization
+from schemas.models import APIResponse
+
+FIELDS = ["id", "source", "original_id", "symbol", "price", "volume_24h", "market_cap", "timestamp", "created_at", "raw_data"]
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    return [
+        (
+            i, "coinpaprika", f"btc-bitcoin-{i}", "BTC", 90000.0 + i, 1.5e10, 1.8e12,
+            now - timedelta(minutes=i), now,
+            {"id": "btc-bitcoin", "rank": 1, "quotes": {"USD": {"price": 90000.0 + i, "volume_24h": 1.5e10, "market_cap": 1.8e12}}}
+        )
+        for i in range(count)
+    ]
+
+def meta(count: int):
+    return {"total": count, "total_is_estimate": False, "skip": 0, "limit": count, "next_cursor": None}
+
+def pydantic_path(rows, fields):
+    response = APIResponse(request_id="bench", api_latency_ms=0.0, data=[dict(zip(fields, row)) for row in rows], meta=meta(len(rows)))
+    return json.dumps(jsonable_encoder(response.model_dump(exclude_unset=True))).encode("utf-8")
+
+def fast_path(rows, fields):
+    return serialization.dumps({"request_id": "bench", "api_latency_ms": 0.0, "data": [dict(zip(fields, row)) for row in rows], "meta": meta(len(rows))})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    encoder = "orjson" if serialization.orjson is not None else "json (install orjson for the C encoder)"
+    print(f"Fast path encoder: {encoder}")
+    print(f"{'rows':>6}  {'fields':8}  {'pydantic ms':>12}  {'fast ms':>9}  {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        for label, fields in (("all", FIELDS), ("default", FIELDS[:-1])):
+            page = [row[:len(fields)] for row in rows]
+            assert json.loads(pydantic_path(page, fields)) == json.loads(fast_path(page, fields))
+            slow = min(timeit.repeat(lambda: pydantic_path(page, fields), number=1, repeat=args.repeat)) * 1000
+            fast = min(timeit.repeat(lambda: fast_path(page, fields), number=1, repeat=args.repeat)) * 1000
+            print(f"{count:>6}  {label:8}  {slow:12.2f}  {fast:9.2f}  {slow / fast:7.1f}x")
+
+if __name__ == "__main__":
+    main()
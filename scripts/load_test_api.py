@@ -0,0 +1,68 @@
+"""
+Measure how many concurrent /data requests a single API worker sustains.
+
+Start one worker with the response cache off, so every request reaches Postgres:
+    CACHE_ENABLED=false uvicorn api.main:app --workers 1
+then run:
+    python scripts/load_test_api.py [--url http://localhost:8000] [--concurrency 10 50 200]
+
+With async routes, throughput keeps rising with concurrency until the database
+pool saturates. It is no longer capped by the threadpool (40 threads by default).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+
+sys.path.append(os.getcwd())
+
+from core.config import settings
+
+async def worker(session, url, params, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            async with session.get(url, params=params) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+async def run_level(base_url, concurrency, duration, params):
+    url = f"{base_url}{settings.API_V1_STR}/data"
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, headers={"X-API-Key": settings.API_KEY}) as session:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(session, url, params, deadline, latencies, errors) for _ in range(concurrency)))
+
+    if not latencies:
+        print(f"{concurrency:>6}  no successful requests ({len(errors)} errors)")
+        return
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{concurrency:>6}  {len(latencies) / duration:9.1f} req/s  p50 {p50:8.1f} ms  p99 {p99:8.1f} ms  errors {len(errors)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'conc':>6}  {'throughput':>15}")
+    for concurrency in args.concurrency:
+        asyncio.run(run_level(args.url, concurrency, args.duration, {"limit": args.limit}))
+
+if __name__ == "__main__":
+    main()
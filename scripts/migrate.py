@@ -0,0 +1,22 @@
+"""
+Apply every pending schema migration, including the heavy ones that rewrite large
+tables and are therefore refused at API startup.
+
+Usage: python scripts/migrate.py
+Run it during a maintenance window with ingestion stopped.
+"""
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from core.logging_config import setup_logging
+from services.database import engine
+from services.migrations import run_migrations
+
+def main():
+    setup_logging()
+    run_migrations(engine, allow_heavy=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from prometheus_client import Counter, Gauge
+from core.config import settings
+from core.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+CACHE_HITS = Counter("response_cache_hits_total", "Response cache hits", ["namespace"])
+CACHE_MISSES = Counter("response_cache_misses_total", "Response cache misses", ["namespace"])
+CACHE_BYTES = Gauge("response_cache_bytes", "Bytes held by the in-process response cache")
+
+class CacheBackend(ABC):
+    """
+    Storage for cached responses. Entries are namespaced by a data generation,
+    so invalidation is a generation bump rather than a scan of the keys.
+    """
+
+    # Whether every API worker sees the same generation
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float):
+        pass
+
+    @abstractmethod
+    def generation(self) -> int:
+        pass
+
+    @abstractmethod
+    def bump_generation(self) -> int:
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU cache with per-entry TTL, capped by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+            CACHE_BYTES.set(self._bytes)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            # Old-generation entries can never be hit again
+            self._entries.clear()
+            self._bytes = 0
+            CACHE_BYTES.set(0)
+            return self._generation
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared backend so every uvicorn worker sees the same entries and invalidations.
+    Requires the optional `redis` package.
+    """
+
+    GENERATION_KEY = "response_cache:generation"
+    shared = True
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def generation(self) -> int:
+        return int(self._client.get(self.GENERATION_KEY) or 0)
+
+    def bump_generation(self) -> int:
+        return int(self._client.incr(self.GENERATION_KEY))
+
+class ResponseCache:
+    """Read-through cache for JSON-serializable responses, keyed by normalized query parameters."""
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        # A TTL of zero or less would expire every entry as it is written
+        self.enabled = enabled and ttl > 0
+
+    def key(self, namespace: str, params: Dict[str, Any]) -> str:
+        normalized = json.dumps(
+            {name: value for name, value in params.items() if value is not None},
+            sort_keys=True, default=str, separators=(",", ":")
+        )
+        return f"response_cache:{self.backend.generation()}:{namespace}:{normalized}"
+
+    def etag(self, namespace: str, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Weak ETag for a query at the current data generation, or None if the backend
+        is unavailable. A per-process generation only changes in the worker that ran
+        ingestion, so without a shared backend the tag also rolls over every TTL,
+        which bounds how long other workers can answer 304 for stale data; with a
+        TTL of zero or less no tag is sent at all.
+        """
+        try:
+            key = self.key(namespace, params)
+        except Exception as e:
+            logger.warning(f"Response cache generation unavailable: {e}")
+            return None
+        if not self.backend.shared:
+            if self.ttl <= 0:
+                return None
+            key = f"{key}:{int(time.time() // self.ttl)}"
+        return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()}"'
+
+    def get(self, namespace: str, params: Dict[str, Any]) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(self.key(namespace, params))
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            value = None
+
+        if value is None:
+            CACHE_MISSES.labels(namespace).inc()
+            return None
+        CACHE_HITS.labels(namespace).inc()
+        return loads(value)
+
+    def set(self, namespace: str, params: Dict[str, Any], value: Any):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(self.key(namespace, params), dumps(value), self.ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def invalidate(self):
+        """
+        Drop every cached response and change every ETag, e.g. after an ingestion run
+        commits new data.
+        """
+        try:
+            generation = self.backend.bump_generation()
+            # Runs invalidate on every progress save, so keep this quiet
+            logger.debug(f"Response cache invalidated (generation {generation})")
+        except Exception as e:
+            logger.error(f"Response cache invalidation failed: {e}")
+
+def _build_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES)
+
+response_cache = ResponseCache(_build_backend(), ttl=settings.CACHE_TTL_SECONDS, enabled=settings.CACHE_ENABLED)
@@ -1,11 +1,16 @@
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Union, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from services.database import SessionLocal
 from schemas.database_models import Checkpoint
 
 logger = logging.getLogger(__name__)
 
+# A checkpoint is either a timestamp (feeds, tickers) or a byte offset (files)
+Cursor = Union[datetime, int]
+
 def load_checkpoint(source_id: str) -> Optional[datetime]:
     db = SessionLocal()
     try:
@@ -32,3 +37,109 @@ def save_checkpoint(source_id: str, last_ingested_at: datetime):
         db.rollback()
     finally:
         db.close()
+
+def load_checkpoints() -> Dict[str, Cursor]:
+    """
+    Load every checkpoint in one query, keyed by source_id.
+    Offset checkpoints take precedence over timestamps.
+    """
+    db = SessionLocal()
+    try:
+        return {
+            checkpoint.source_id: checkpoint.last_offset if checkpoint.last_offset is not None else checkpoint.last_ingested_at
+            for checkpoint in db.query(Checkpoint).all()
+        }
+    except Exception as e:
+        logger.error(f"Failed to load checkpoints: {e}")
+        return {}
+    finally:
+        db.close()
+
+def upsert_checkpoints(db, cursors: Dict[str, Cursor]):
+    """
+    Advance checkpoints inside the caller's transaction, so they commit atomically
+    with the rows they cover. Checkpoints never move backwards.
+    """
+    if not cursors:
+        return
+
+    rows = []
+    for source_id, cursor in cursors.items():
+        if isinstance(cursor, datetime):
+            rows.append({"source_id": source_id, "last_ingested_at": cursor, "last_offset": None})
+        else:
+            rows.append({"source_id": source_id, "last_ingested_at": datetime.utcnow(), "last_offset": cursor})
+
+    stmt = insert(Checkpoint).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Checkpoint.source_id],
+        set_={
+            "last_ingested_at": func.greatest(Checkpoint.last_ingested_at, stmt.excluded.last_ingested_at),
+            "last_offset": func.greatest(Checkpoint.last_offset, stmt.excluded.last_offset)
+        }
+    )
+    db.execute(stmt)
+
+def load_feed_validators(source_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return the stored (ETag, Last-Modified) pair for a feed."""
+    db = SessionLocal()
+    try:
+        checkpoint = db.query(Checkpoint).filter(Checkpoint.source_id == source_id).first()
+        return (checkpoint.etag, checkpoint.last_modified) if checkpoint else (None, None)
+    except Exception as e:
+        logger.error(f"Failed to load feed validators for {source_id}: {e}")
+        return None, None
+    finally:
+        db.close()
+
+def save_feed_validators(source_id: str, etag: Optional[str], last_modified: Optional[str]):
+    db = SessionLocal()
+    try:
+        # No timestamp on insert: a feed's first validators must not imply a time checkpoint
+        stmt = insert(Checkpoint).values(
+            source_id=source_id, last_ingested_at=None, etag=etag, last_modified=last_modified
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Checkpoint.source_id],
+            set_={"etag": stmt.excluded.etag, "last_modified": stmt.excluded.last_modified}
+        )
+        db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to save feed validators for {source_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def load_file_fingerprint(source_id: str) -> Optional[str]:
+    """Return the stored identity of the file a byte-offset checkpoint points into."""
+    db = SessionLocal()
+    try:
+        checkpoint = db.query(Checkpoint).filter(Checkpoint.source_id == source_id).first()
+        return checkpoint.file_fingerprint if checkpoint else None
+    except Exception as e:
+        logger.error(f"Failed to load file fingerprint for {source_id}: {e}")
+        return None
+    finally:
+        db.close()
+
+def save_file_fingerprint(source_id: str, fingerprint: str, reset_offset: bool = False):
+    """
+    Store a file's identity. With reset_offset the checkpoint is cleared, the only
+    way it moves backwards, so a replaced or truncated file is read from the start.
+    """
+    db = SessionLocal()
+    try:
+        stmt = insert(Checkpoint).values(source_id=source_id, last_ingested_at=None, file_fingerprint=fingerprint)
+        set_ = {"file_fingerprint": stmt.excluded.file_fingerprint}
+        if reset_offset:
+            set_["last_offset"] = None
+            set_["last_ingested_at"] = None
+        stmt = stmt.on_conflict_do_update(index_elements=[Checkpoint.source_id], set_=set_)
+        db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to save file fingerprint for {source_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,94 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from statistics import median
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, insert, select
+from core.config import settings
+from services.database import SessionLocal
+from schemas.database_models import ConsensusPrice, LatestQuote
+
+logger = logging.getLogger(__name__)
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+def reject_outliers(quotes: List[Dict[str, Any]], threshold: Optional[float], min_sources: int):
+    """
+    Split quotes into (kept, rejected) by distance from the median price in scaled MADs.
+    Rejection is skipped when disabled or when too few sources report to judge.
+    """
+    if threshold is None or len(quotes) < min_sources:
+        return quotes, []
+    center = median(quote["price"] for quote in quotes)
+    mad = median(abs(quote["price"] - center) for quote in quotes) * MAD_SCALE
+    if mad == 0:
+        # Most sources agree exactly; anything off that value is an outlier
+        kept = [quote for quote in quotes if quote["price"] == center]
+    else:
+        kept = [quote for quote in quotes if abs(quote["price"] - center) <= threshold * mad]
+    rejected = [quote for quote in quotes if quote not in kept]
+    return kept, rejected
+
+def compute_consensus(
+    quotes: List[Dict[str, Any]],
+    threshold: Optional[float] = None,
+    min_sources: int = 3
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Reconcile the latest quote of each source into one consensus row per symbol:
+    median price, volume-weighted average price and the spread between sources.
+    """
+    by_symbol: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for quote in quotes:
+        if quote.get("symbol") and quote.get("price") is not None:
+            by_symbol[quote["symbol"]].append(quote)
+
+    consensus = {}
+    for symbol, symbol_quotes in by_symbol.items():
+        kept, rejected = reject_outliers(symbol_quotes, threshold, min_sources)
+        prices = [quote["price"] for quote in kept]
+        weighted = [(quote["price"], quote["volume_24h"]) for quote in kept if quote.get("volume_24h")]
+        total_volume = sum(volume for _, volume in weighted)
+        median_price = median(prices)
+        spread = max(prices) - min(prices)
+        consensus[symbol] = {
+            "symbol": symbol,
+            "median_price": median_price,
+            "vwap": sum(price * volume for price, volume in weighted) / total_volume if total_volume else None,
+            "spread": spread,
+            "spread_pct": spread / median_price * 100 if median_price else None,
+            "sources": sorted(quote["source"] for quote in kept),
+            "rejected_sources": sorted(quote["source"] for quote in rejected),
+            "timestamp": max(quote["timestamp"] for quote in kept)
+        }
+    return consensus
+
+def refresh_consensus() -> int:
+    """
+    Recompute consensus_prices from latest_quotes, replacing the previous results
+    atomically. Called once per ingestion run. Returns the number of symbols.
+    """
+    db = SessionLocal()
+    try:
+        quotes = [
+            {"symbol": q.symbol, "source": q.source, "price": q.price, "volume_24h": q.volume_24h, "timestamp": q.timestamp}
+            for q in db.execute(select(LatestQuote)).scalars()
+        ]
+        consensus = compute_consensus(
+            quotes,
+            threshold=settings.CONSENSUS_OUTLIER_THRESHOLD,
+            min_sources=settings.CONSENSUS_MIN_SOURCES_FOR_OUTLIERS
+        )
+        computed_at = datetime.utcnow()
+        db.execute(delete(ConsensusPrice))
+        if consensus:
+            db.execute(insert(ConsensusPrice), [{**row, "computed_at": computed_at} for row in consensus.values()])
+        db.commit()
+        return len(consensus)
+    except Exception as e:
+        logger.error(f"Failed to refresh consensus prices: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
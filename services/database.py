@@ -1,17 +1,53 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from core.config import settings
+from services.db_metrics import instrumented_pool, instrument_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
-engine = create_engine(settings.DATABASE_URL)
+def _pool_options(pool_class, name: str, size: int, overflow: int) -> dict:
+    return {
+        "poolclass": instrumented_pool(pool_class, name, size + overflow),
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# Ingestion (orchestrator, checkpoints, migrations) and the API use separate engines, so
+# a long ingestion run cannot exhaust the connections API requests need, and vice versa.
+engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args={"options": f"-c statement_timeout={settings.INGEST_DB_STATEMENT_TIMEOUT_MS}"},
+    **_pool_options(QueuePool, "ingest", settings.INGEST_DB_POOL_SIZE, settings.INGEST_DB_MAX_OVERFLOW)
+)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> str:
+    """Same database as DATABASE_URL, reached through the asyncpg driver."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# The API serves requests on the event loop through asyncpg; ingestion workers keep the sync engine
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    connect_args={"server_settings": {"statement_timeout": str(settings.API_DB_STATEMENT_TIMEOUT_MS)}},
+    **_pool_options(AsyncAdaptedQueuePool, "api", settings.API_DB_POOL_SIZE, settings.API_DB_MAX_OVERFLOW)
+)
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def init_db():
     
-    import schemas.database_models
-    Base.metadata.create_all(bind=engine)
+    from services.migrations import run_migrations
+    from services.partitions import ensure_upcoming_partitions
+    run_migrations(engine, allow_heavy=settings.RUN_HEAVY_MIGRATIONS)
+    ensure_upcoming_partitions(engine)
 
 def get_db():
     db = SessionLocal()
@@ -19,3 +55,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
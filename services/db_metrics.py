@@ -0,0 +1,61 @@
+import time
+from typing import Type
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["pool"])
+POOL_SATURATION = Gauge("db_pool_saturation", "Checked-out connections as a fraction of pool_size + max_overflow", ["pool"])
+POOL_CONNECTIONS_OPENED = Counter("db_pool_connections_opened_total", "New database connections opened by the pool", ["pool"])
+POOL_CONNECTIONS_CLOSED = Counter("db_pool_connections_closed_total", "Database connections closed by the pool", ["pool"])
+POOL_INVALIDATIONS = Counter("db_pool_invalidations_total", "Pooled connections invalidated after errors or failed pre-pings", ["pool"])
+
+def instrumented_pool(pool_class: Type[Pool], name: str, capacity: int) -> Type[Pool]:
+    """
+    Subclass of a queue pool that records how long each checkout waits for a
+    connection. The name and capacity live on the class, so they survive the pool
+    being recreated by engine.dispose().
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return pool_class._do_get(self)
+        finally:
+            POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - started)
+
+    return type(f"Instrumented{pool_class.__name__}", (pool_class,), {
+        "metrics_name": name,
+        "metrics_capacity": capacity,
+        "_do_get": _do_get
+    })
+
+def instrument_engine(engine):
+    """Export saturation and connection churn of an engine's pool (use sync_engine for async engines)."""
+    def _usage(pool):
+        checked_out = pool.checkedout()
+        POOL_CHECKED_OUT.labels(pool.metrics_name).set(checked_out)
+        POOL_SATURATION.labels(pool.metrics_name).set(checked_out / pool.metrics_capacity)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_OPENED.labels(engine.pool.metrics_name).inc()
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_CLOSED.labels(engine.pool.metrics_name).inc()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.labels(engine.pool.metrics_name).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _usage(engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _usage(engine.pool)
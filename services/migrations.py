@@ -0,0 +1,218 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Union
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Serializes migrations when several workers start at once
+MIGRATION_LOCK_ID = 7_461_001
+
+@dataclass
+class Migration:
+    version: str
+    # SQL strings, or callables taking the connection for steps SQL alone cannot express
+    statements: List[Union[str, Callable]]
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    transactional: bool = True
+    # Rewrites large tables; only applied when explicitly allowed (scripts/migrate.py)
+    heavy: bool = False
+
+def _unless_partitioned(table: str, statements: List[str]) -> Callable:
+    """
+    Run `statements` only while `table` is a plain table. Postgres rejects them on the
+    partitioned tables create_all builds, which already carry what they would add.
+    """
+    def apply(conn):
+        relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table}).scalar()
+        if relkind == "p":
+            logger.info(f"Skipping steps for partitioned {table}")
+            return
+        for statement in statements:
+            conn.execute(text(statement))
+    return apply
+
+def _partition_tables(conn):
+    """Rebuild raw_data and unified_data as monthly range-partitioned tables."""
+    from services.partitions import convert_to_partitioned
+    from schemas.database_models import RawData, UnifiedData
+    convert_to_partitioned(conn, RawData.__table__, "now()")
+    # The partitioned unified_data no longer has the payload column, so link rows first
+    _link_unified_to_raw(conn)
+    convert_to_partitioned(conn, UnifiedData.__table__, "COALESCE(created_at, now())")
+
+def _link_unified_to_raw(conn):
+    """
+    Point unified_data rows at the raw_data row holding the same payload, then drop the
+    copied payload column. Rows whose payload is no longer in raw_data (for example
+    dropped by retention) are left with a NULL reference.
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns("unified_data")}
+    if "raw_data" not in columns:
+        return
+    conn.execute(text(
+        "ALTER TABLE unified_data ADD COLUMN IF NOT EXISTS raw_data_id INTEGER, "
+        "ADD COLUMN IF NOT EXISTS raw_ingested_at TIMESTAMP"
+    ))
+    # Legacy duplicates in raw_data share a payload; any one of them will do
+    conn.execute(text(
+        "UPDATE unified_data SET raw_data_id = raw.id, raw_ingested_at = raw.ingested_at "
+        "FROM raw_data raw WHERE unified_data.raw_data_id IS NULL AND raw.source = unified_data.source "
+        "AND raw.external_id = unified_data.original_id AND raw.data = unified_data.raw_data"
+    ))
+    unlinked = conn.execute(text(
+        "SELECT count(*) FROM unified_data WHERE raw_data_id IS NULL AND raw_data IS NOT NULL"
+    )).scalar()
+    if unlinked:
+        logger.warning(f"{unlinked} unified_data rows have no matching raw_data row; their payload copy is dropped")
+    conn.execute(text("ALTER TABLE unified_data DROP COLUMN raw_data"))
+
+def _reclaim_unified_data(conn):
+    """
+    Rewrite each unified_data partition. DROP COLUMN only hides the payload; VACUUM FULL
+    copies the rows without it and returns the space. Each partition is locked only
+    while it is rewritten.
+    """
+    from services.partitions import list_partitions
+    for partition in list_partitions(conn, "unified_data"):
+        conn.execute(text(f'VACUUM (FULL, ANALYZE) "{partition}"'))
+
+def _rollup_backfill(resolution: str, unit: str) -> str:
+    """Build one resolution of ohlcv_rollups from the existing unified_data history."""
+    return (
+        "INSERT INTO ohlcv_rollups (symbol, resolution, bucket, source, open, high, low, close, volume, open_time, close_time, sample_count) "
+        f"SELECT symbol, '{resolution}', date_trunc('{unit}', timestamp) AS bucket, source, "
+        "(array_agg(price ORDER BY timestamp, id))[1], max(price), min(price), "
+        "(array_agg(price ORDER BY timestamp DESC, id DESC))[1], (array_agg(volume_24h ORDER BY timestamp DESC, id DESC))[1], "
+        "min(timestamp), max(timestamp), count(*) "
+        "FROM unified_data WHERE symbol IS NOT NULL AND price IS NOT NULL AND timestamp IS NOT NULL "
+        "GROUP BY symbol, bucket, source "
+        "ON CONFLICT DO NOTHING"
+    )
+
+MIGRATIONS: List[Migration] = [
+    Migration("0001_checkpoint_offsets", [
+        "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS last_offset BIGINT",
+    ]),
+    Migration("0002_raw_data_content_hash", [
+        "ALTER TABLE raw_data ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+        # Partitioned raw_data deduplicates through raw_data_fingerprints instead
+        _unless_partitioned("raw_data", [
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_data_source_external_id_hash ON raw_data (source, external_id, content_hash)",
+        ]),
+    ]),
+    Migration("0003_feed_validators", [
+        "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS etag VARCHAR",
+        "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS last_modified VARCHAR",
+    ]),
+    # CONCURRENTLY is not supported on partitioned tables, which create_all builds with these indexes
+    Migration("0004_unified_data_access_path_indexes", [
+        _unless_partitioned("unified_data", [
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_unified_data_symbol_timestamp ON unified_data (symbol, timestamp DESC, id DESC)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_unified_data_source_timestamp ON unified_data (source, timestamp DESC, id DESC)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_unified_data_timestamp_id ON unified_data (timestamp DESC, id DESC)",
+            # Superseded by the composite indexes above
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_unified_data_source",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_unified_data_timestamp",
+        ]),
+    ], transactional=False),
+    # latest_quotes itself is created by create_all; seed it from the existing history
+    Migration("0005_latest_quotes_backfill", [
+        "INSERT INTO latest_quotes (symbol, source, original_id, price, volume_24h, market_cap, timestamp, updated_at) "
+        "SELECT DISTINCT ON (symbol, source) symbol, source, original_id, price, volume_24h, market_cap, timestamp, now() "
+        "FROM unified_data WHERE symbol IS NOT NULL AND price IS NOT NULL AND timestamp IS NOT NULL "
+        "ORDER BY symbol, source, timestamp DESC, id DESC "
+        "ON CONFLICT (symbol, source) DO NOTHING",
+    ]),
+    Migration("0006_ohlcv_rollups_backfill", [
+        _rollup_backfill("1m", "minute"),
+        _rollup_backfill("1h", "hour"),
+        _rollup_backfill("1d", "day"),
+    ]),
+    Migration("0007_job_progress", [
+        "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS progress JSONB",
+    ]),
+    # Rewrites both tables; expect a write outage proportional to their size
+    Migration("0008_partition_raw_and_unified_data", [
+        _partition_tables,
+        "INSERT INTO raw_data_fingerprints (source, external_id, content_hash, first_seen_at) "
+        "SELECT source, external_id, content_hash, min(ingested_at) FROM raw_data "
+        "WHERE content_hash IS NOT NULL GROUP BY source, external_id, content_hash "
+        "ON CONFLICT DO NOTHING",
+    ], heavy=True),
+    # Updates every unified_data row
+    Migration("0009_unified_data_raw_reference", [
+        _link_unified_to_raw,
+    ], heavy=True),
+    # VACUUM cannot run inside a transaction
+    Migration("0010_reclaim_unified_data_payloads", [
+        _reclaim_unified_data,
+    ], transactional=False, heavy=True),
+    Migration("0011_checkpoint_file_fingerprint", [
+        "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS file_fingerprint VARCHAR(64)",
+    ]),
+]
+
+def run_migrations(engine: Engine, allow_heavy: bool = False):
+    """
+    Create missing tables, then apply pending migrations in order and record them
+    in schema_migrations. create_all builds fresh databases at the latest schema,
+    so on those every migration is recorded without running; migrations are
+    idempotent so they bring existing databases to the same state.
+
+    Raises RuntimeError without applying anything if a heavy migration is pending
+    and `allow_heavy` is false.
+    """
+    from services.database import Base
+    import schemas.database_models
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Index builds and backfills may legitimately outlast the ingestion statement_timeout
+        conn.execute(text("SET statement_timeout = 0"))
+        conn.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+        try:
+            inspector = inspect(conn)
+            fresh = not any(inspector.has_table(name) for name in Base.metadata.tables)
+            Base.metadata.create_all(bind=conn)
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version VARCHAR PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT now())"
+            ))
+            applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+            heavy = [m.version for m in MIGRATIONS if m.heavy and m.version not in applied]
+            if heavy and not fresh and not allow_heavy:
+                raise RuntimeError(
+                    f"Pending migrations {', '.join(heavy)} rewrite large tables and are not applied at startup; "
+                    "run them with scripts/migrate.py during a maintenance window, or set RUN_HEAVY_MIGRATIONS=true"
+                )
+
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                if fresh:
+                    _record(conn, migration.version)
+                    continue
+                logger.info(f"Applying migration {migration.version}")
+                if migration.transactional:
+                    # The lock connection is in autocommit mode, so use a separate real transaction
+                    with engine.begin() as tx:
+                        tx.execute(text("SET LOCAL statement_timeout = 0"))
+                        _apply(tx, migration)
+                        _record(tx, migration.version)
+                else:
+                    _apply(conn, migration)
+                    _record(conn, migration.version)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+            conn.execute(text("RESET statement_timeout"))
+
+def _apply(conn, migration: Migration):
+    for statement in migration.statements:
+        if callable(statement):
+            statement(conn)
+        else:
+            conn.execute(text(statement))
+
+def _record(conn, version: str):
+    conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
@@ -0,0 +1,159 @@
+import logging
+import re
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection, Engine
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Monthly range-partitioned tables and their partition key
+PARTITIONED_TABLES = {"raw_data": "ingested_at", "unified_data": "timestamp"}
+
+# Partitions this process has created or seen, so the write path skips DDL for known months
+_known_partitions: Set[str] = set()
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+def default_partition_ddl(table: str) -> str:
+    """Catch-all partition, so rows written outside the ingestion path never fail to route."""
+    return f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+
+def _bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+def create_partition(conn: Connection, table: str, month: date):
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} FOR VALUES {_bounds(month)}"))
+
+def move_from_default(engine: Engine, table: str, month: date):
+    """
+    Create the month's partition when the default partition already holds rows for it,
+    which makes CREATE ... PARTITION OF fail: build the table standalone, move the rows
+    out of the default partition and attach it, all in one transaction.
+    """
+    name, key = partition_name(table, month), PARTITIONED_TABLES[table]
+    upper = add_months(month, 1)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {key} >= :lower AND {key} < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), {"lower": month, "upper": upper})
+        conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}"))
+
+def ensure_partitions(engine: Engine, table: str, values: Iterable[Optional[datetime]]):
+    """
+    Create the monthly partitions covering `values` before rows are written to them.
+    Uses its own autocommit connection, so a rolled-back batch cannot undo the DDL
+    while this process still believes the partition exists. A month that cannot get
+    its partition is remembered too; its rows keep landing in the default partition.
+    """
+    missing = sorted({
+        month_start(value) for value in values
+        if value is not None and partition_name(table, month_start(value)) not in _known_partitions
+    })
+    if not missing:
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for month in missing:
+            name = partition_name(table, month)
+            try:
+                create_partition(conn, table, month)
+            except Exception:
+                # Usually rows for this month were already routed to the default partition
+                try:
+                    move_from_default(engine, table, month)
+                    logger.info(f"Moved rows of {name} out of {table}_default")
+                except Exception as e:
+                    logger.error(f"Could not create partition {name}, its rows stay in {table}_default: {e}")
+            _known_partitions.add(name)
+
+def ensure_upcoming_partitions(engine: Engine, months_ahead: Optional[int] = None):
+    """Pre-create partitions from the current month through PARTITION_PREMAKE_MONTHS ahead."""
+    months_ahead = settings.PARTITION_PREMAKE_MONTHS if months_ahead is None else months_ahead
+    current = month_start(datetime.utcnow())
+    upcoming = [datetime.combine(add_months(current, offset), datetime.min.time()) for offset in range(months_ahead + 1)]
+    for table in PARTITIONED_TABLES:
+        ensure_partitions(engine, table, upcoming)
+
+def list_partitions(conn: Connection, table: str) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": table}).scalars())
+
+def apply_retention(engine: Engine) -> List[str]:
+    """
+    Detach and drop every monthly partition that ends before the retention cutoff,
+    instead of deleting rows. Returns the dropped partition names.
+    """
+    retention = {"raw_data": settings.RAW_DATA_RETENTION_MONTHS, "unified_data": settings.UNIFIED_DATA_RETENTION_MONTHS}
+    retention = {table: months for table, months in retention.items() if months}
+    if not retention:
+        return []
+    with engine.connect() as conn:
+        partitions = {table: list_partitions(conn, table) for table in retention}
+
+    dropped = []
+    for table, months in retention.items():
+        cutoff = add_months(month_start(datetime.utcnow()), -months)
+        for name in partitions[table]:
+            match = re.fullmatch(rf"{table}_p(\d{{4}})(\d{{2}})", name)
+            if not match or add_months(date(int(match[1]), int(match[2]), 1), 1) > cutoff:
+                continue
+            # One transaction per partition keeps each ACCESS EXCLUSIVE lock short
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+            _known_partitions.discard(name)
+            dropped.append(name)
+        if table == "raw_data":
+            # Payloads whose raw rows are gone may be stored again if they reappear
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM raw_data_fingerprints WHERE first_seen_at < :cutoff"), {"cutoff": cutoff})
+    if dropped:
+        logger.info(f"Retention dropped partitions: {', '.join(dropped)}")
+    return dropped
+
+def convert_to_partitioned(conn: Connection, table: Table, key_fallback: str):
+    """
+    Rebuild an existing heap table as the partitioned table the ORM now defines and
+    copy its rows across. Rows with a NULL partition key get `key_fallback` (SQL).
+    No-op when the table is already partitioned, e.g. on databases built by create_all.
+    """
+    name, key = table.name, PARTITIONED_TABLES[table.name]
+    relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}).scalar()
+    if relkind != "r":
+        return
+
+    legacy = f"{name}_unpartitioned"
+    conn.execute(text(f"ALTER TABLE {name} RENAME TO {legacy}"))
+    # Free index, constraint and sequence names for the new table
+    for index in conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = :legacy"), {"legacy": legacy}).scalars().all():
+        conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index[:48]}_unpartitioned"'))
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:legacy, 'id')"), {"legacy": legacy}).scalar()
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} RENAME TO {legacy}_id_seq"))
+
+    table.create(conn)
+    key_value = f"COALESCE({key}, {key_fallback})"
+    for month in conn.execute(text(f"SELECT DISTINCT date_trunc('month', {key_value}) FROM {legacy}")).scalars().all():
+        create_partition(conn, name, month_start(month))
+
+    columns = [column.name for column in table.columns]
+    select_list = ", ".join(key_value if column == key else column for column in columns)
+    conn.execute(text(f"INSERT INTO {name} ({', '.join(columns)}) SELECT {select_list} FROM {legacy}"))
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE((SELECT max(id) FROM {name}), 0) + 1, false)"
+    ))
+    conn.execute(text(f"DROP TABLE {legacy}"))
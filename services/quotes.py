@@ -0,0 +1,50 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from schemas.database_models import LatestQuote
+
+logger = logging.getLogger(__name__)
+
+def upsert_latest_quotes(db, rows: Iterable[Dict[str, Any]]):
+    """
+    Fold unified rows into latest_quotes inside the caller's transaction.
+    A quote is only replaced by a strictly newer one, so late or replayed rows are ignored.
+    """
+    newest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for row in rows:
+        if not row.get("symbol") or row.get("price") is None or row.get("timestamp") is None:
+            continue
+        key = (row["symbol"], row["source"])
+        if key not in newest or row["timestamp"] > newest[key]["timestamp"]:
+            newest[key] = row
+    if not newest:
+        return
+
+    updated_at = datetime.utcnow()
+    stmt = insert(LatestQuote).values([
+        {
+            "symbol": row["symbol"],
+            "source": row["source"],
+            "original_id": row["original_id"],
+            "price": row["price"],
+            "volume_24h": row.get("volume_24h"),
+            "market_cap": row.get("market_cap"),
+            "timestamp": row["timestamp"],
+            "updated_at": updated_at
+        }
+        for row in newest.values()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LatestQuote.symbol, LatestQuote.source],
+        set_={
+            "original_id": stmt.excluded.original_id,
+            "price": stmt.excluded.price,
+            "volume_24h": stmt.excluded.volume_24h,
+            "market_cap": stmt.excluded.market_cap,
+            "timestamp": stmt.excluded.timestamp,
+            "updated_at": stmt.excluded.updated_at
+        },
+        where=LatestQuote.timestamp < stmt.excluded.timestamp
+    )
+    db.execute(stmt)
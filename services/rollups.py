@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert
+from schemas.database_models import OHLCVRollup
+
+logger = logging.getLogger(__name__)
+
+# Resolution name -> datetime fields zeroed to get the bucket start (and date_trunc unit)
+RESOLUTIONS = {
+    "1m": ("minute", {"second": 0, "microsecond": 0}),
+    "1h": ("hour", {"minute": 0, "second": 0, "microsecond": 0}),
+    "1d": ("day", {"hour": 0, "minute": 0, "second": 0, "microsecond": 0}),
+}
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    return timestamp.replace(**RESOLUTIONS[resolution][1])
+
+def upsert_rollups(db, rows: Iterable[Dict[str, Any]]):
+    """
+    Merge unified rows into ohlcv_rollups inside the caller's transaction.
+
+    Rows are first folded into partial candles per bucket, which are then merged
+    with the stored ones: open/close follow the earliest/latest sample time, so
+    out-of-order batches produce the same candle as in-order ones.
+    """
+    candles: Dict[Tuple[str, str, datetime, str], Dict[str, Any]] = {}
+    for row in rows:
+        price, timestamp = row.get("price"), row.get("timestamp")
+        if not row.get("symbol") or price is None or timestamp is None:
+            continue
+        for resolution in RESOLUTIONS:
+            key = (row["symbol"], resolution, bucket_start(timestamp, resolution), row["source"])
+            candle = candles.get(key)
+            if candle is None:
+                candles[key] = {
+                    "symbol": key[0], "resolution": resolution, "bucket": key[2], "source": key[3],
+                    "open": price, "high": price, "low": price, "close": price,
+                    "volume": row.get("volume_24h"),
+                    "open_time": timestamp, "close_time": timestamp, "sample_count": 1
+                }
+                continue
+            candle["high"] = max(candle["high"], price)
+            candle["low"] = min(candle["low"], price)
+            candle["sample_count"] += 1
+            if timestamp < candle["open_time"]:
+                candle["open"], candle["open_time"] = price, timestamp
+            if timestamp >= candle["close_time"]:
+                candle["close"], candle["close_time"], candle["volume"] = price, timestamp, row.get("volume_24h")
+    if not candles:
+        return
+
+    stmt = insert(OHLCVRollup).values(list(candles.values()))
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OHLCVRollup.symbol, OHLCVRollup.resolution, OHLCVRollup.bucket, OHLCVRollup.source],
+        set_={
+            "open": case((excluded.open_time < OHLCVRollup.open_time, excluded.open), else_=OHLCVRollup.open),
+            "open_time": func.least(OHLCVRollup.open_time, excluded.open_time),
+            "high": func.greatest(OHLCVRollup.high, excluded.high),
+            "low": func.least(OHLCVRollup.low, excluded.low),
+            "close": case((excluded.close_time >= OHLCVRollup.close_time, excluded.close), else_=OHLCVRollup.close),
+            "volume": case((excluded.close_time >= OHLCVRollup.close_time, excluded.volume), else_=OHLCVRollup.volume),
+            "close_time": func.greatest(OHLCVRollup.close_time, excluded.close_time),
+            "sample_count": OHLCVRollup.sample_count + excluded.sample_count
+        }
+    )
+    db.execute(stmt)
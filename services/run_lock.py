@@ -0,0 +1,65 @@
+import logging
+from typing import Optional
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from schemas.database_models import Job
+
+logger = logging.getLogger(__name__)
+
+# Held for the whole of an ingestion run; at most one run per database
+INGEST_RUN_LOCK_ID = 7_461_002
+
+_LOCK_HELD = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' "
+    "AND classid = 0 AND objid = :lock_id AND objsubid = 1 AND granted)"
+)
+
+class RunLock:
+    """
+    Session-level Postgres advisory lock, held on a dedicated autocommit connection
+    so it spans every worker and process sharing the database and is released
+    automatically if the holder dies.
+    """
+
+    def __init__(self, engine: Engine, lock_id: int = INGEST_RUN_LOCK_ID):
+        self.engine = engine
+        self.lock_id = lock_id
+        self._conn = None
+
+    def acquire(self) -> bool:
+        conn = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}).scalar()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def release(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id})
+            self._conn.close()
+        except Exception as e:
+            # The session may still hold the lock; discard it rather than return it to the pool
+            logger.error(f"Failed to release run lock, discarding its connection: {e}")
+            self._conn.invalidate()
+        finally:
+            self._conn = None
+
+async def active_run_id(db) -> Optional[str]:
+    """
+    run_id of the ingestion run currently holding the lock, if any. Jobs left
+    'Running' by a crashed process are ignored because their lock is gone.
+    """
+    held = (await db.execute(_LOCK_HELD, {"lock_id": INGEST_RUN_LOCK_ID})).scalar()
+    if not held:
+        return None
+    return (await db.execute(
+        select(Job.run_id).where(Job.status == "Running").order_by(Job.start_time.desc()).limit(1)
+    )).scalar()
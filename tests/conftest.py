@@ -1,10 +1,13 @@
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from api.main import app
-from services.database import get_db, Base
+from services.database import get_db, get_async_db, async_database_url, Base
 from core.config import settings
+from services.cache import response_cache
 
 
 
@@ -12,6 +15,8 @@ SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# TestClient runs each client on its own event loop, so async connections must not be pooled
+async_engine = create_async_engine(async_database_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
 
 @pytest.fixture(scope="module")
 def test_db():
@@ -31,6 +36,17 @@ def db_session(test_db):
     transaction.rollback()
     connection.close()
 
+@pytest.fixture(scope="function")
+def committed_session(test_db):
+    """Session whose commits are visible to the API's async connections; all rows are removed afterwards."""
+    session = TestingSessionLocal()
+    yield session
+    session.rollback()
+    for table in reversed(Base.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    session.close()
+
 @pytest.fixture(scope="function")
 def client(db_session):
     def override_get_db():
@@ -39,7 +55,14 @@ def client(db_session):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Each test sees its own rolled-back data, so nothing cached may carry over
+    response_cache.invalidate()
     # Add API Key to headers
     headers = {"X-API-Key": settings.API_KEY}
     with TestClient(app, headers=headers) as c:
@@ -1,12 +1,93 @@
+import asyncio
+import json
 import pytest
 from datetime import datetime
+from ingestion.csv_source import CSVSource
 from services.checkpoint import save_checkpoint, load_checkpoint
 from schemas.database_models import Job
 from ingestion.orchestrator import Orchestrator
+from ingestion.base import IngestionSource
+from core.config import settings
+
+class StaticSource(IngestionSource):
+    """Serves fixed CSV-shaped items, so orchestrator runs need no network."""
+    provider = "csv"
+
+    def __init__(self, name: str, symbols, checkpoint_id=None):
+        self.name = name
+        self.symbols = symbols
+        self.checkpoint_id = checkpoint_id
+
+    def __str__(self):
+        return f"StaticSource({self.name})"
+
+    async def ingest(self):
+        # Offset-style cursors, one per row, when the source is checkpointed
+        return [
+            {
+                "source": "csv", "external_id": f"{self.name}-{symbol}",
+                "data": {"symbol": symbol, "price": "1", "volume": "1", "market_cap": "1"},
+                "checkpoint_id": self.checkpoint_id, "cursor": position if self.checkpoint_id else None
+            }
+            for position, symbol in enumerate(self.symbols, start=1)
+        ]
 
 def test_checkpoint_logic(db_session):
     pass 
 
+def test_csv_resumes_from_offset(tmp_path):
+    csv_file = tmp_path / "prices.csv"
+    csv_file.write_text("symbol,price,volume,market_cap\nSOL,150.0,5000000,70000000000\nADA,0.45,1000000,15000000000\n")
+
+    async def collect(since=None):
+        return [item async for item in CSVSource(str(csv_file)).stream(since=since)]
+
+    items = asyncio.run(collect())
+    assert [item["data"]["symbol"] for item in items] == ["SOL", "ADA"]
+
+    resumed = asyncio.run(collect(since=items[0]["cursor"]))
+    assert [item["data"]["symbol"] for item in resumed] == ["ADA"]
+    assert asyncio.run(collect(since=items[-1]["cursor"])) == []
+
+def test_csv_checkpoint_resets_when_file_is_replaced(tmp_path, committed_session):
+    from services.checkpoint import load_checkpoints, upsert_checkpoints
+
+    csv_file = tmp_path / "prices.csv"
+    csv_file.write_text("symbol,price,volume,market_cap\nSOL,150.0,5000000,70000000000\nADA,0.45,1000000,15000000000\n")
+    source = CSVSource(str(csv_file))
+    end = csv_file.stat().st_size
+
+    assert asyncio.run(source.resume_from(None)) is None
+    upsert_checkpoints(committed_session, {source.checkpoint_id: end})
+    committed_session.commit()
+
+    # Appending keeps the identity, so the offset stands
+    with open(csv_file, "a") as f:
+        f.write("ETH,3000,1,1\n")
+    assert asyncio.run(source.resume_from(end)) == end
+
+    # A replaced file restarts from the top, in memory and in the stored checkpoint
+    csv_file.write_text("symbol,price,volume,market_cap\nDOT,7.0,1,1\nBTC,1,1,1\nXRP,1,1,1\n")
+    assert asyncio.run(source.resume_from(end)) is None
+    assert load_checkpoints().get(source.checkpoint_id) is None
+    upsert_checkpoints(committed_session, {source.checkpoint_id: 40})
+    committed_session.commit()
+    assert load_checkpoints()[source.checkpoint_id] == 40
+
+    # So does one truncated below the offset
+    assert asyncio.run(source.resume_from(10_000)) is None
+
+def test_checkpoint_skips_old_items():
+    orchestrator = Orchestrator()
+    orchestrator._checkpoints = {"rss:feed": datetime(2025, 12, 9, 10, 0, 0)}
+
+    old_item = {"checkpoint_id": "rss:feed", "cursor": datetime(2025, 12, 9, 10, 0, 0)}
+    new_item = {"checkpoint_id": "rss:feed", "cursor": datetime(2025, 12, 9, 11, 0, 0)}
+
+    assert not orchestrator._is_new(old_item)
+    assert orchestrator._is_new(new_item)
+    assert orchestrator._is_new({"checkpoint_id": "rss:other", "cursor": datetime(2020, 1, 1)})
+
 def test_rss_normalization():
     orchestrator = Orchestrator()
     raw_data = {
@@ -18,8 +99,7 @@ def test_rss_normalization():
     unified = orchestrator._normalize(
         source="rss",
         external_id="http://test.com/news",
-        data=raw_data,
-        raw_data=raw_data
+        data=raw_data
     )
     
     assert unified.timestamp.year == 2025
@@ -34,3 +114,535 @@ def test_job_tracking(db_session):
     saved_job = db_session.query(Job).filter(Job.run_id == "test-run").first()
     assert saved_job.items_processed == 10
     assert saved_job.status == "Completed"
+
+def test_response_cache_lru_and_invalidation():
+    from services.cache import MemoryCacheBackend, ResponseCache
+
+    cache = ResponseCache(MemoryCacheBackend(max_entries=2, max_bytes=1024), ttl=60)
+    cache.set("data", {"limit": 1}, {"n": 1})
+    cache.set("data", {"limit": 2}, {"n": 2})
+    assert cache.get("data", {"limit": 1}) == {"n": 1}
+
+    # Least recently used entry is evicted once the entry cap is exceeded
+    cache.set("data", {"limit": 3}, {"n": 3})
+    assert cache.get("data", {"limit": 2}) is None
+    assert cache.get("data", {"limit": 1, "symbol": None}) == {"n": 1}
+
+    cache.invalidate()
+    assert cache.get("data", {"limit": 1}) is None
+
+def test_latest_quotes_keep_newest_row(db_session):
+    from schemas.database_models import LatestQuote
+    from services.quotes import upsert_latest_quotes
+
+    upsert_latest_quotes(db_session, [
+        {"symbol": "BTC", "source": "csv", "original_id": "2", "price": 2.0, "timestamp": datetime(2025, 1, 2)},
+        {"symbol": None, "source": "rss", "original_id": "3", "price": None, "timestamp": datetime(2025, 1, 3)},
+    ])
+    # A later batch carrying an older and a replayed quote must not replace it
+    upsert_latest_quotes(db_session, [
+        {"symbol": "BTC", "source": "csv", "original_id": "1", "price": 1.0, "timestamp": datetime(2025, 1, 1)},
+        {"symbol": "BTC", "source": "csv", "original_id": "2b", "price": 9.0, "timestamp": datetime(2025, 1, 2)},
+    ])
+
+    quotes = db_session.query(LatestQuote).all()
+    assert [(quote.symbol, quote.source, quote.original_id, quote.price) for quote in quotes] == [("BTC", "csv", "2", 2.0)]
+
+    upsert_latest_quotes(db_session, [
+        {"symbol": "BTC", "source": "csv", "original_id": "4", "price": 4.0, "timestamp": datetime(2025, 1, 4)},
+    ])
+    db_session.expire_all()
+    quote = db_session.query(LatestQuote).one()
+    assert (quote.original_id, quote.price, quote.timestamp) == ("4", 4.0, datetime(2025, 1, 4))
+
+def test_zero_ttl_disables_caching():
+    from services.cache import MemoryCacheBackend, ResponseCache
+
+    cache = ResponseCache(MemoryCacheBackend(max_entries=2, max_bytes=1024), ttl=0)
+    cache.set("data", {"limit": 1}, {"n": 1})
+    assert cache.get("data", {"limit": 1}) is None
+    assert cache.etag("data", {"limit": 1}) is None
+
+def test_etag_changes_with_generation():
+    from starlette.requests import Request
+    from services.cache import MemoryCacheBackend, ResponseCache
+    from api.conditional import etag_matches
+
+    cache = ResponseCache(MemoryCacheBackend(max_entries=2, max_bytes=1024), ttl=60)
+    etag = cache.etag("data", {"limit": 10})
+    assert etag == cache.etag("data", {"limit": 10, "symbol": None})
+    assert etag != cache.etag("data", {"limit": 20})
+
+    request = Request({"type": "http", "headers": [(b"if-none-match", f'"other", {etag}'.encode())]})
+    assert etag_matches(request, etag)
+
+    cache.invalidate()
+    assert not etag_matches(request, cache.etag("data", {"limit": 10}))
+
+def test_second_run_coalesces_when_lock_is_held(monkeypatch):
+    import ingestion.orchestrator as orchestrator_module
+
+    class HeldLock:
+        def __init__(self, engine):
+            pass
+
+        def acquire(self):
+            return False
+
+    monkeypatch.setattr(orchestrator_module, "RunLock", HeldLock)
+    orchestrator = Orchestrator()
+    coalesced = []
+    monkeypatch.setattr(orchestrator, "_record_coalesced", coalesced.append)
+    monkeypatch.setattr(orchestrator, "_run", lambda *args: pytest.fail("run started without the lock"))
+
+    asyncio.run(orchestrator.run(run_id="second"))
+    assert coalesced == ["second"]
+
+def test_retention_drops_old_partitions(committed_session, monkeypatch):
+    from datetime import date
+    from services.database import engine
+    from services.partitions import create_partition, list_partitions
+
+    with engine.begin() as conn:
+        for table in ("raw_data", "unified_data"):
+            create_partition(conn, table, date(2000, 1, 1))
+    monkeypatch.setattr(settings, "RAW_DATA_RETENTION_MONTHS", 12)
+    monkeypatch.setattr(settings, "UNIFIED_DATA_RETENTION_MONTHS", 12)
+
+    orchestrator = Orchestrator()
+    orchestrator.sources = [StaticSource("retention", ["BTC"])]
+    asyncio.run(orchestrator.run(run_id="retention"))
+
+    with engine.connect() as conn:
+        assert "raw_data_p200001" not in list_partitions(conn, "raw_data")
+        assert "unified_data_p200001" not in list_partitions(conn, "unified_data")
+    job = committed_session.query(Job).filter(Job.run_id == "retention").one()
+    assert job.status == "Completed"
+    assert job.items_processed == 1
+
+def test_simulated_failure_fails_the_run(committed_session):
+    orchestrator = Orchestrator()
+    orchestrator.sources = [StaticSource("first", ["BTC"]), StaticSource("second", ["ETH"])]
+    asyncio.run(orchestrator.run(simulate_failure=True, run_id="simulated"))
+
+    job = committed_session.query(Job).filter(Job.run_id == "simulated").one()
+    assert job.status == "Failed"
+    assert job.items_processed >= 1
+    assert job.error_count == 1
+
+def test_failed_unlock_does_not_leak_the_run_lock(test_db):
+    from services.database import engine
+    from services.run_lock import RunLock
+
+    lock = RunLock(engine)
+    assert lock.acquire()
+
+    def broken_execute(*args, **kwargs):
+        raise RuntimeError("connection lost")
+
+    lock._conn.execute = broken_execute
+    lock.release()
+
+    # The lock's session was discarded, not pooled, so the lock is free again
+    other = RunLock(engine)
+    assert other.acquire()
+    other.release()
+
+def test_coalesced_run_bumps_the_cache_generation(committed_session):
+    from services.cache import response_cache
+
+    generation = response_cache.backend.generation()
+    Orchestrator()._record_coalesced("coalesced")
+
+    assert committed_session.query(Job).filter(Job.run_id == "coalesced").one().status == "Coalesced"
+    assert response_cache.backend.generation() != generation
+
+class StubResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def read(self):
+        return self.body
+
+    async def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class StubSession:
+    """Replays canned responses in order and records the request headers."""
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.urls = []
+        self.params = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.requests.append(headers or {})
+        self.urls.append(url)
+        self.params.append(params or {})
+        return self.responses.pop(0)
+
+def test_rss_unchanged_feed_is_skipped_with_304(committed_session):
+    from ingestion.rss_source import RSSSource
+    from services.checkpoint import load_feed_validators
+
+    feed = (
+        b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+        b'<item><title>a</title><link>http://test.com/a</link><pubDate>Mon, 06 Jan 2025 10:00:00 GMT</pubDate></item>'
+        b'</channel></rss>'
+    )
+    source = RSSSource("http://test.com/feed")
+    source.session = StubSession([
+        StubResponse(200, feed, {"ETag": '"v1"', "Content-Type": "application/rss+xml"}),
+        StubResponse(304),
+    ])
+
+    async def consume():
+        return [item async for item in source.stream()]
+
+    assert [item["external_id"] for item in asyncio.run(consume())] == ["http://test.com/a"]
+    # Validators wait until the entries are committed
+    assert load_feed_validators(source.checkpoint_id) == (None, None)
+    asyncio.run(source.on_complete())
+    assert load_feed_validators(source.checkpoint_id) == ('"v1"', None)
+
+    assert asyncio.run(consume()) == []
+    assert source.session.requests[1]["If-None-Match"] == '"v1"'
+
+def test_failed_row_holds_back_its_checkpoint(committed_session, monkeypatch):
+    import ingestion.orchestrator as orchestrator_module
+    from schemas.database_models import UnifiedData
+    from services.checkpoint import load_checkpoints
+
+    upsert_rollups = orchestrator_module.upsert_rollups
+
+    def flaky_rollups(db, rows):
+        if any(row["symbol"] == "ETH" for row in rows):
+            raise RuntimeError("transient failure")
+        upsert_rollups(db, rows)
+
+    def run(run_id):
+        orchestrator = Orchestrator()
+        orchestrator.sources = [StaticSource("ticks", ["BTC", "ETH", "SOL"], checkpoint_id="csv:ticks")]
+        asyncio.run(orchestrator.run(run_id=run_id))
+
+    monkeypatch.setattr(orchestrator_module, "upsert_rollups", flaky_rollups)
+    run("first")
+    assert load_checkpoints()["csv:ticks"] == 1
+    assert {row.symbol for row in committed_session.query(UnifiedData)} == {"BTC", "SOL"}
+
+    monkeypatch.setattr(orchestrator_module, "upsert_rollups", upsert_rollups)
+    run("second")
+    assert load_checkpoints()["csv:ticks"] == 3
+    assert sorted(row.symbol for row in committed_session.query(UnifiedData)) == ["BTC", "ETH", "SOL"]
+
+def test_progress_saves_change_the_etag(committed_session):
+    from services.cache import response_cache
+
+    committed_session.add(Job(run_id="live", status="Running"))
+    committed_session.commit()
+    etag = response_cache.etag("runs", {"limit": 10})
+
+    Orchestrator()._write_progress("live", {"csv": {"status": "writing", "fetched": 5}}, 5, 0)
+
+    assert response_cache.etag("runs", {"limit": 10}) != etag
+    committed_session.expire_all()
+    assert committed_session.query(Job).filter(Job.run_id == "live").one().items_processed == 5
+
+def test_prepare_stage_hashes_off_the_event_loop(monkeypatch):
+    import threading
+    import ingestion.orchestrator as orchestrator_module
+    from ingestion.orchestrator import _SourceComplete
+
+    threads = []
+    real_hash = orchestrator_module.content_hash
+
+    def recording_hash(data):
+        threads.append(threading.current_thread())
+        return real_hash(data)
+
+    monkeypatch.setattr(orchestrator_module, "content_hash", recording_hash)
+    orchestrator = Orchestrator()
+    source = StaticSource("prep", [])
+    items = [{"source": "csv", "external_id": str(i), "data": {"symbol": "BTC", "price": str(i)}} for i in range(3)]
+
+    async def prepare():
+        fetched, prepared = asyncio.Queue(), asyncio.Queue()
+        for item in [items[0], items[1], _SourceComplete(source), items[2], None]:
+            fetched.put_nowait(item)
+        await orchestrator._prepare_stage(fetched, prepared)
+        return [prepared.get_nowait() for _ in range(prepared.qsize())]
+
+    out = asyncio.run(prepare())
+
+    assert threads and threading.main_thread() not in threads
+    assert [item["external_id"] if isinstance(item, dict) else item for item in out[:2]] == ["0", "1"]
+    assert isinstance(out[2], _SourceComplete)
+    assert out[3]["external_id"] == "2" and out[4] is None
+    assert all("content_hash" in item for item in items)
+
+def test_heavy_migrations_are_refused_unless_allowed(committed_session, monkeypatch):
+    from sqlalchemy import text
+    from services import migrations
+    from services.database import engine
+    applied = []
+    rewrite = migrations.Migration("9999_test_rewrite", [lambda conn: applied.append(True)], heavy=True)
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [rewrite])
+
+    try:
+        with pytest.raises(RuntimeError, match="9999_test_rewrite"):
+            migrations.run_migrations(engine)
+        assert applied == []
+
+        migrations.run_migrations(engine, allow_heavy=True)
+        assert applied == [True]
+    finally:
+        committed_session.execute(text("DELETE FROM schema_migrations WHERE version = '9999_test_rewrite'"))
+        committed_session.commit()
+
+def test_batch_tickers_only_for_several_coins(monkeypatch):
+    from ingestion.api_source import CoinPaprikaSource, CoinPaprikaBatchSource
+    from ingestion.coingecko_source import CoinGeckoSource, CoinGeckoBatchSource
+    monkeypatch.setattr(settings, "RSS_FEEDS", [])
+    monkeypatch.setattr(settings, "CSV_FILES", [])
+
+    monkeypatch.setattr(settings, "COIN_IDS", ["btc-bitcoin"])
+    assert [type(source) for source in Orchestrator().sources] == [CoinPaprikaSource, CoinGeckoSource]
+
+    monkeypatch.setattr(settings, "COIN_IDS", ["btc-bitcoin", "eth-ethereum"])
+    assert [type(source) for source in Orchestrator().sources] == [CoinPaprikaBatchSource, CoinGeckoBatchSource]
+
+def test_coinpaprika_batch_fans_out_and_skips_missing_coins(caplog):
+    from ingestion.api_source import CoinPaprikaBatchSource
+    tickers = [
+        {"id": "btc-bitcoin", "last_updated": "2025-01-01T00:00:00Z"},
+        {"id": "eth-ethereum", "last_updated": "2025-01-01T00:01:00Z"},
+        {"id": "not-configured", "last_updated": "2025-01-01T00:02:00Z"},
+    ]
+    source = CoinPaprikaBatchSource(["btc-bitcoin", "eth-ethereum", "sol-solana"])
+    source.session = StubSession([StubResponse(200, json.dumps(tickers).encode())])
+
+    items = asyncio.run(source.ingest())
+    assert source.session.urls == [f"{settings.COINPAPRIKA_API_URL}/tickers"]
+    assert [(item["external_id"], item["checkpoint_id"]) for item in items] == [
+        ("btc-bitcoin", "coinpaprika:btc-bitcoin"), ("eth-ethereum", "coinpaprika:eth-ethereum")
+    ]
+    assert items[1]["cursor"] == datetime(2025, 1, 1, 0, 1)
+    assert "sol-solana" in caplog.text
+
+def test_coingecko_batch_chunks_requests_and_skips_missing_coins(caplog):
+    from ingestion.coingecko_source import CoinGeckoBatchSource
+    price = {"usd": 1.0, "last_updated_at": 1735689600}
+    source = CoinGeckoBatchSource(["btc-bitcoin", "eth-ethereum", "sol-solana"], chunk_size=2)
+    source.session = StubSession([
+        StubResponse(200, json.dumps({"bitcoin": price, "ethereum": price}).encode()),
+        StubResponse(200, b"{}"),
+    ])
+
+    items = asyncio.run(source.ingest())
+    assert [params["ids"] for params in source.session.params] == ["bitcoin,ethereum", "solana"]
+    assert [(item["external_id"], item["data"]["symbol_injected"]) for item in items] == [("bitcoin", "BTC"), ("ethereum", "ETH")]
+    assert items[0]["cursor"] == datetime(2025, 1, 1)
+    assert "No data returned for solana" in caplog.text
+
+def test_batch_is_written_in_one_pass_and_duplicates_write_nothing(committed_session, monkeypatch):
+    from schemas.database_models import RawData, RawDataFingerprint, UnifiedData
+    from services.checkpoint import load_checkpoints
+
+    orchestrator = Orchestrator()
+    monkeypatch.setattr(orchestrator, "_write_rows", lambda items: pytest.fail("batch fell back to per-row writes"))
+    items = asyncio.run(StaticSource("batch", ["BTC", "ETH", "SOL"], checkpoint_id="csv:batch").ingest())
+    orchestrator._prepare_items(items)
+
+    assert orchestrator._write_batch(items) == 3
+    assert committed_session.query(RawData).count() == 3
+    assert committed_session.query(RawDataFingerprint).count() == 3
+    assert sorted(row.symbol for row in committed_session.query(UnifiedData)) == ["BTC", "ETH", "SOL"]
+    assert load_checkpoints()["csv:batch"] == 3
+
+    # The same payloads again: nothing is stored, but the checkpoint still moves
+    replay = [dict(item, cursor=item["cursor"] + 3) for item in items]
+    assert orchestrator._write_batch(replay) == 0
+    assert committed_session.query(RawData).count() == 3
+    assert committed_session.query(UnifiedData).count() == 3
+    assert load_checkpoints()["csv:batch"] == 6
+
+class GatedSource(IngestionSource):
+    """Yields its items one at a time, waiting on `gate` (if any) after the first."""
+    provider = "csv"
+
+    def __init__(self, name: str, count: int, gate=None):
+        self.name = name
+        self.count = count
+        self.gate = gate
+        self.yielded = 0
+
+    def __str__(self):
+        return f"GatedSource({self.name})"
+
+    async def ingest(self):
+        return []
+
+    async def stream(self, since=None):
+        for position in range(self.count):
+            if position == 1 and self.gate is not None:
+                await self.gate.wait()
+            self.yielded += 1
+            yield {"source": "csv", "external_id": f"{self.name}-{position}", "data": {"symbol": "BTC"}, "content_hash": "x"}
+
+def test_bounded_fetch_queue_holds_back_fetchers():
+    orchestrator = Orchestrator()
+    source = GatedSource("bulk", 50)
+
+    async def fetch_without_a_consumer():
+        fetched = asyncio.Queue(maxsize=2)
+        task = asyncio.create_task(orchestrator._fetch_source(source, fetched, asyncio.Semaphore(1), asyncio.Semaphore(1)))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        task.cancel()
+        return fetched.qsize()
+
+    assert asyncio.run(fetch_without_a_consumer()) == 2
+    # Two queued plus the one waiting for room
+    assert source.yielded == 3
+
+def test_writer_drains_while_fetchers_run_and_completes_sources_after_their_rows(monkeypatch):
+    orchestrator = Orchestrator()
+    orchestrator._items_processed = orchestrator._error_count = 0
+    events = []
+
+    async def main():
+        first_written = asyncio.Event()
+        slow = GatedSource("slow", 3, gate=first_written)
+        quick = GatedSource("quick", 2)
+        orchestrator.sources = [slow, quick]
+
+        def write_batch(items):
+            events.append(("write", [item["external_id"] for item in items]))
+            first_written.set()
+            return len(items)
+
+        async def complete_source(source):
+            events.append(("complete", source.name))
+
+        async def no_progress():
+            pass
+
+        monkeypatch.setattr(orchestrator, "_write_batch", write_batch)
+        monkeypatch.setattr(orchestrator, "_complete_source", complete_source)
+        monkeypatch.setattr(orchestrator, "_save_progress", no_progress)
+        fetched, prepared = asyncio.Queue(maxsize=4), asyncio.Queue(maxsize=4)
+        providers = {"csv": asyncio.Semaphore(2)}
+        # The slow source only gets past its first item once the writer has stored something
+        await asyncio.wait_for(asyncio.gather(
+            orchestrator._fetch_stage(fetched, asyncio.Semaphore(2), providers),
+            orchestrator._prepare_stage(fetched, prepared),
+            orchestrator._write_stage(prepared),
+        ), timeout=5)
+
+    asyncio.run(main())
+    written = [external_id for kind, ids in events if kind == "write" for external_id in ids]
+    assert sorted(written) == ["quick-0", "quick-1", "slow-0", "slow-1", "slow-2"]
+    assert orchestrator._items_processed == 5
+    for name in ("slow", "quick"):
+        completed_at = events.index(("complete", name))
+        last_write = max(i for i, (kind, ids) in enumerate(events) if kind == "write" and any(x.startswith(name) for x in ids))
+        assert last_write < completed_at
+
+def test_sources_share_one_http_session_per_run(committed_session):
+    seen = []
+
+    class SessionRecordingSource(StaticSource):
+        async def ingest(self):
+            seen.append(self.session)
+            return await super().ingest()
+
+    orchestrator = Orchestrator()
+    orchestrator.sources = [SessionRecordingSource("first", ["BTC"]), SessionRecordingSource("second", ["ETH"])]
+    asyncio.run(orchestrator.run(run_id="shared-session"))
+
+    assert len(seen) == 2 and seen[0] is not None and seen[0] is seen[1]
+    assert seen[0].closed
+    assert all(source.session is None for source in orchestrator.sources)
+    assert committed_session.query(Job).filter(Job.run_id == "shared-session").one().status == "Completed"
+
+def test_engine_pools_follow_settings_and_export_metrics(client):
+    from prometheus_client import REGISTRY
+    from services.database import engine, async_engine
+
+    for pool, size, overflow in (
+        (engine.pool, settings.INGEST_DB_POOL_SIZE, settings.INGEST_DB_MAX_OVERFLOW),
+        (async_engine.sync_engine.pool, settings.API_DB_POOL_SIZE, settings.API_DB_MAX_OVERFLOW),
+    ):
+        assert (pool.size(), pool._max_overflow) == (size, overflow)
+        assert pool._timeout == settings.DB_POOL_TIMEOUT_SECONDS
+        assert pool._recycle == settings.DB_POOL_RECYCLE_SECONDS
+        assert pool._pre_ping == settings.DB_POOL_PRE_PING
+        assert pool.metrics_capacity == size + overflow
+
+    waits = REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", {"pool": "ingest"}) or 0
+    with engine.connect():
+        assert REGISTRY.get_sample_value("db_pool_checked_out", {"pool": "ingest"}) >= 1
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", {"pool": "ingest"}) > waits
+
+    exported = client.get("/metrics").text
+    for name in ("db_pool_checkout_wait_seconds", "db_pool_checked_out", "db_pool_saturation", "db_pool_connections_opened_total"):
+        assert f'{name}{{pool="ingest"}}' in exported or f'{name}_count{{pool="ingest"}}' in exported
+
+def test_sources_fetch_concurrently_within_provider_limits():
+    orchestrator = Orchestrator()
+    orchestrator._error_count = 0
+    active, peak = {"total": 0}, {}
+
+    class SlowSource(IngestionSource):
+        def __init__(self, provider):
+            self.provider = provider
+
+        async def ingest(self):
+            for key in ("total", self.provider):
+                active[key] = active.get(key, 0) + 1
+                peak[key] = max(peak.get(key, 0), active[key])
+            await asyncio.sleep(0.02)
+            for key in ("total", self.provider):
+                active[key] -= 1
+            return []
+
+    orchestrator.sources = [SlowSource("paced") for _ in range(3)] + [SlowSource("wide") for _ in range(4)]
+    providers = {"paced": asyncio.Semaphore(1), "wide": asyncio.Semaphore(2)}
+
+    async def main():
+        fetched = asyncio.Queue()
+        await orchestrator._fetch_stage(fetched, asyncio.Semaphore(8), providers)
+
+    asyncio.run(main())
+    assert peak == {"total": 3, "paced": 1, "wide": 2}
+
+def test_only_successful_responses_grow_provider_concurrency():
+    from ingestion.http_client import limited_get
+    from ingestion.rate_limit import get_limiter
+
+    async def main():
+        limiter = get_limiter("rss")
+        limiter.concurrency.limit = start = 2.0
+        session = StubSession([StubResponse(503), StubResponse(200)])
+        async with limited_get(session, "rss", "http://test.com/feed") as response:
+            assert response.status == 503
+        assert limiter.concurrency.limit == start
+        async with limited_get(session, "rss", "http://test.com/feed") as response:
+            assert response.status == 200
+        assert limiter.concurrency.limit > start
+
+    asyncio.run(main())
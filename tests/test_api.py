@@ -11,3 +11,147 @@ def test_get_data_empty(client):
     data = response.json()
     assert data["data"] == []
     assert data["meta"]["total"] == 0
+
+def test_get_data_cursor_pagination(client, committed_session):
+    response = client.get("/api/v1/data", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+    from datetime import datetime
+    from api.pagination import encode_cursor
+    response = client.get("/api/v1/data", params={"cursor": encode_cursor(datetime(2030, 1, 1), 1), "count": "none"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["data"] == []
+    assert data["meta"]["total"] is None
+    assert data["meta"]["next_cursor"] is None
+
+    # Five rows share one timestamp, so pages must split ties by id
+    from schemas.database_models import UnifiedData
+    timestamps = [datetime(2025, 1, 2)] * 5 + [datetime(2025, 1, 1), datetime(2025, 1, 3)]
+    committed_session.add_all([
+        UnifiedData(source="csv", original_id=str(i), symbol="BTC", price=1.0, timestamp=timestamp)
+        for i, timestamp in enumerate(timestamps)
+    ])
+    committed_session.commit()
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "original_id"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/v1/data", params=params).json()
+        pages.append([row["original_id"] for row in body["data"]])
+        cursor = body["meta"]["next_cursor"]
+        if cursor is None:
+            break
+
+    seen = [original_id for page in pages for original_id in page]
+    assert len(seen) == len(set(seen))
+    assert sorted(seen) == sorted(str(i) for i in range(len(timestamps)))
+    assert seen[0] == "6" and seen[-1] == "5"
+
+def test_get_data_fields_projection(client, committed_session):
+    from datetime import datetime
+    from schemas.database_models import RawData, UnifiedData
+    raw = RawData(source="csv", external_id="1", data={"payload": "large"}, ingested_at=datetime(2025, 1, 1))
+    committed_session.add(raw)
+    committed_session.flush()
+    committed_session.add(UnifiedData(
+        source="csv", original_id="1", symbol="BTC", price=1.0, timestamp=datetime(2025, 1, 1),
+        raw_data_id=raw.id, raw_ingested_at=raw.ingested_at
+    ))
+    committed_session.commit()
+
+    row = client.get("/api/v1/data").json()["data"][0]
+    assert "raw_data" not in row
+    assert row["symbol"] == "BTC"
+
+    response = client.get("/api/v1/data", params={"fields": "symbol,raw_data"})
+    assert response.json()["data"][0] == {"symbol": "BTC", "raw_data": {"payload": "large"}}
+
+    assert client.get("/api/v1/data", params={"fields": "nope"}).status_code == 400
+
+def test_get_data_not_modified(client):
+    response = client.get("/api/v1/data")
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/data", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+def test_triggered_run_is_visible_before_it_starts(client, committed_session, monkeypatch):
+    from ingestion.orchestrator import Orchestrator
+    started = []
+
+    async def deferred_run(self, simulate_failure=False, run_id=None):
+        started.append(run_id)
+
+    monkeypatch.setattr(Orchestrator, "run", deferred_run)
+    run_id = client.post("/api/v1/ingest").json()["run_id"]
+
+    assert started == [run_id]
+    response = client.get(f"/api/v1/runs/{run_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "Pending"
+
+    # Whatever the trigger turns into updates that row rather than adding one
+    from schemas.database_models import Job
+    Orchestrator()._record_coalesced(run_id)
+    jobs = committed_session.query(Job).filter(Job.run_id == run_id).all()
+    assert [job.status for job in jobs] == ["Coalesced"]
+
+def test_aggregate_pages_instead_of_truncating(client, committed_session):
+    from datetime import datetime
+    from services.rollups import upsert_rollups
+    # Two sources share every bucket, so pages have to split within a bucket
+    upsert_rollups(committed_session, [
+        {"symbol": "BTC", "source": source, "price": 1.0 + hour, "volume_24h": 1.0, "timestamp": datetime(2025, 1, 1, hour)}
+        for hour in range(3) for source in ("csv", "rss")
+    ])
+    committed_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"symbol": "BTC", "interval": "1h", "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/v1/data/aggregate", params=params).json()
+        seen += [(candle["bucket"], candle["source"]) for candle in body["data"]]
+        cursor = body["meta"]["next_cursor"]
+        assert body["meta"]["truncated"] == (cursor is not None)
+        if cursor is None:
+            break
+
+    assert len(seen) == 6
+    assert seen == sorted(set(seen))
+    assert client.get("/api/v1/data/aggregate", params={"symbol": "BTC", "cursor": "bad"}).status_code == 400
+
+def test_export_streams_a_time_range_in_both_formats(client, committed_session, monkeypatch):
+    import json
+    from datetime import datetime
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from schemas.database_models import UnifiedData
+    from tests.conftest import async_engine
+    from core.config import settings
+    import api.export
+
+    # Same NullPool engine as the request sessions; several fetches per export
+    monkeypatch.setattr(api.export, "AsyncSessionLocal", async_sessionmaker(async_engine))
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    committed_session.add_all([
+        UnifiedData(source="csv", original_id=str(day), symbol="BTC", price=float(day), timestamp=datetime(2025, 1, day))
+        for day in range(1, 8)
+    ])
+    committed_session.commit()
+    params = {"symbol": "BTC", "start": "2025-01-02T00:00:00", "end": "2025-01-07T00:00:00", "fields": "original_id,price"}
+
+    response = client.get("/api/v1/data/export", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [{"original_id": str(day), "price": float(day)} for day in range(2, 7)]
+
+    response = client.get("/api/v1/data/export", params={**params, "format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == ["original_id,price"] + [f"{day},{float(day)}" for day in range(2, 7)]
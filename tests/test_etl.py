@@ -1,3 +1,4 @@
+import json
 import pytest
 from datetime import datetime
 from ingestion.orchestrator import Orchestrator
@@ -20,8 +21,7 @@ def test_normalize_coinpaprika():
     unified = orchestrator._normalize(
         source="coinpaprika",
         external_id="btc-bitcoin",
-        data=raw_data,
-        raw_data=raw_data
+        data=raw_data
     )
     
     assert unified is not None
@@ -44,10 +44,131 @@ def test_normalize_csv():
     unified = orchestrator._normalize(
         source="csv",
         external_id="eth-ethereum",
-        data=raw_data,
-        raw_data=raw_data
+        data=raw_data
     )
     
     assert unified is not None
     assert unified.symbol == "ETH"
     assert unified.price == 4000.0
+
+def test_content_hash_is_stable():
+    from core.hashing import content_hash
+
+    payload = {"symbol": "BTC", "quotes": {"USD": {"price": 90000.0, "volume_24h": 1.0}}}
+    reordered = {"quotes": {"USD": {"volume_24h": 1.0, "price": 90000.0}}, "symbol": "BTC"}
+
+    assert content_hash(payload) == content_hash(reordered)
+    assert content_hash(payload) != content_hash({**payload, "symbol": "ETH"})
+
+def test_csv_chunks_are_line_aligned(tmp_path):
+    from ingestion.csv_chunks import plan_chunks, parse_chunk
+
+    csv_file = tmp_path / "ticks.csv"
+    csv_file.write_text("symbol,price,volume,market_cap\n" + "".join(f"BTC,{i}.5,{i},{i}\n" for i in range(100)))
+    header_end = len("symbol,price,volume,market_cap\n")
+
+    chunks = plan_chunks(str(csv_file), header_end, 64)
+    batches = [parse_chunk(str(csv_file), start, end, ["symbol", "price", "volume", "market_cap"], "csv:ticks") for start, end in chunks]
+
+    assert len(chunks) > 1
+    assert chunks[-1][1] == csv_file.stat().st_size
+    assert sum(len(batch) for batch in batches) == 100
+    assert [item["data"]["price"] for item in batches[0][:2]] == ["0.5", "1.5"]
+    assert batches[-1][-1]["cursor"] == csv_file.stat().st_size
+    assert batches[0][0]["checkpoint_id"] == "csv:ticks"
+
+def test_export_encoders():
+    from api.export import encode_csv, encode_ndjson
+    fields = ["symbol", "timestamp", "raw_data"]
+    rows = [("BTC", datetime(2025, 1, 1), {"a": 1})]
+
+    lines = encode_ndjson(rows, fields).splitlines()
+    assert [json.loads(line) for line in lines] == [{"symbol": "BTC", "timestamp": "2025-01-01T00:00:00", "raw_data": {"a": 1}}]
+    assert encode_csv(rows, fields, header=True) == 'symbol,timestamp,raw_data\nBTC,2025-01-01T00:00:00,"{""a"": 1}"\n'
+
+def test_rollups_fold_out_of_order_rows(db_session):
+    from schemas.database_models import OHLCVRollup
+    from services.rollups import upsert_rollups
+
+    # The second batch holds both the earliest and an in-between sample
+    upsert_rollups(db_session, [
+        {"symbol": "BTC", "source": "csv", "price": 3.0, "volume_24h": 30.0, "timestamp": datetime(2025, 1, 1, 10, 30)},
+    ])
+    upsert_rollups(db_session, [
+        {"symbol": "BTC", "source": "csv", "price": 1.0, "volume_24h": 10.0, "timestamp": datetime(2025, 1, 1, 10, 5)},
+        {"symbol": "BTC", "source": "csv", "price": 5.0, "volume_24h": 50.0, "timestamp": datetime(2025, 1, 1, 10, 20)},
+    ])
+
+    hourly = db_session.query(OHLCVRollup).filter(OHLCVRollup.resolution == "1h").one()
+    assert hourly.bucket == datetime(2025, 1, 1, 10)
+    assert (hourly.open, hourly.high, hourly.low, hourly.close) == (1.0, 5.0, 1.0, 3.0)
+    assert hourly.volume == 30.0
+    assert hourly.sample_count == 3
+    assert (hourly.open_time, hourly.close_time) == (datetime(2025, 1, 1, 10, 5), datetime(2025, 1, 1, 10, 30))
+    assert db_session.query(OHLCVRollup).filter(OHLCVRollup.resolution == "1m").count() == 3
+
+def test_consensus_rejects_outliers():
+    from services.consensus import compute_consensus
+    ts = datetime(2025, 1, 1)
+    quotes = [
+        {"symbol": "BTC", "source": "coinpaprika", "price": 100.0, "volume_24h": 3.0, "timestamp": ts},
+        {"symbol": "BTC", "source": "coingecko", "price": 102.0, "volume_24h": 1.0, "timestamp": ts},
+        {"symbol": "BTC", "source": "csv", "price": 101.0, "volume_24h": None, "timestamp": ts},
+        {"symbol": "BTC", "source": "stale", "price": 150.0, "volume_24h": 1.0, "timestamp": ts},
+    ]
+
+    result = compute_consensus(quotes, threshold=3.0)["BTC"]
+    assert result["rejected_sources"] == ["stale"]
+    assert result["median_price"] == 101.0
+    assert result["vwap"] == 100.5
+    assert result["spread"] == 2.0
+
+    unfiltered = compute_consensus(quotes, threshold=None)["BTC"]
+    assert unfiltered["rejected_sources"] == []
+    assert unfiltered["spread"] == 50.0
+
+def test_monthly_partition_bounds():
+    from datetime import date
+    from services.partitions import add_months, month_start, partition_name
+    assert month_start(datetime(2025, 12, 31, 23, 59)) == date(2025, 12, 1)
+    assert add_months(date(2025, 12, 1), 1) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -13) == date(2023, 12, 1)
+    assert partition_name("unified_data", date(2025, 3, 1)) == "unified_data_p202503"
+
+def test_partition_takes_over_default_rows(committed_session):
+    from sqlalchemy import text
+    from schemas.database_models import UnifiedData
+    from services.database import engine
+    from services.partitions import ensure_partitions, list_partitions
+
+    committed_session.add(UnifiedData(source="csv", original_id="old", symbol="BTC", price=1.0, timestamp=datetime(1999, 5, 10)))
+    committed_session.commit()
+
+    ensure_partitions(engine, "unified_data", [datetime(1999, 5, 10)])
+
+    with engine.connect() as conn:
+        assert "unified_data_p199905" in list_partitions(conn, "unified_data")
+        assert conn.execute(text("SELECT count(*) FROM unified_data_p199905")).scalar() == 1
+        assert conn.execute(text("SELECT count(*) FROM unified_data_default")).scalar() == 0
+
+def test_csv_modes_produce_identical_items(tmp_path, monkeypatch):
+    import asyncio
+    from core.config import settings
+    from ingestion.csv_source import CSVSource
+
+    csv_file = tmp_path / "ticks.csv"
+    csv_file.write_text("id,symbol,price,volume,market_cap\n1,NAN,1.5,2,3\n2,INF,2.5,3,4\n3,BTC,3.5\n")
+
+    async def read():
+        return [item async for item in CSVSource(str(csv_file)).stream()]
+
+    line_items = asyncio.run(read())
+    monkeypatch.setattr(settings, "CSV_CHUNKED_MIN_BYTES", 0)
+    chunked_items = asyncio.run(read())
+
+    assert chunked_items == line_items
+    from core.hashing import content_hash
+    assert all(item["content_hash"] == content_hash(item["data"]) for item in chunked_items)
+    assert [item["external_id"] for item in line_items] == ["1", "2", "3"]
+    assert line_items[0]["data"]["symbol"] == "NAN"
+    assert "volume" not in line_items[2]["data"]
@@ -12,8 +12,54 @@ def test_normalize_invalid_data():
     unified = orchestrator._normalize(
         source="coinpaprika",
         external_id="btc-bitcoin",
-        data=raw_data,
-        raw_data=raw_data
+        data=raw_data
     )
     
     assert unified is None
+
+def test_throttling_shrinks_concurrency():
+    from ingestion.rate_limit import AdaptiveConcurrency, parse_retry_after
+
+    window = AdaptiveConcurrency(maximum=8, latency_target=1.0)
+    assert window.limit == 4
+
+    window.on_throttle()
+    assert window.limit == 2
+
+    for _ in range(10):
+        window.on_success(0.1)
+    assert 2 < window.limit <= 8
+
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("not a date") is None
+
+def test_failed_row_is_retried_on_the_next_attempt(committed_session, monkeypatch):
+    import ingestion.orchestrator as orchestrator_module
+    from schemas.database_models import RawData, RawDataFingerprint, UnifiedData
+
+    def broken_rollups(db, rows):
+        raise RuntimeError("rollup write failed")
+
+    item = {"source": "csv", "external_id": "retry", "data": {"symbol": "BTC", "price": "1", "volume": "1", "market_cap": "1"}}
+    orchestrator = Orchestrator()
+    monkeypatch.setattr(orchestrator_module, "upsert_rollups", broken_rollups)
+    assert orchestrator._process_item_wrapper(dict(item)) == orchestrator_module.FAILED
+    assert committed_session.query(RawDataFingerprint).count() == 0
+    assert committed_session.query(RawData).count() == 0
+
+    monkeypatch.undo()
+    assert orchestrator._process_item_wrapper(dict(item)) == orchestrator_module.WRITTEN
+    assert committed_session.query(UnifiedData).count() == 1
+
+def test_server_errors_are_retried():
+    import aiohttp
+    from unittest.mock import MagicMock
+    from ingestion.http_client import is_transient_error
+
+    def response_error(status):
+        return aiohttp.ClientResponseError(MagicMock(), (), status=status)
+
+    assert is_transient_error(response_error(503))
+    assert not is_transient_error(response_error(404))
+    assert is_transient_error(aiohttp.ServerDisconnectedError())
+    assert not is_transient_error(ValueError())
@@ -60,8 +60,7 @@ async def verify():
     unified = orchestrator._normalize(
         source="coingecko",
         external_id="bitcoin",
-        data=mock_item["data"],
-        raw_data=mock_item["data"]
+        data=mock_item["data"]
     )
     
     if unified and unified.price == 89815 and unified.symbol == "BTC":
@@ -78,8 +77,7 @@ async def verify():
             "symbol": "BTC", 
             "last_updated": "2024-01-01T00:00:00Z",
             "quotes": {"USD": {"price": 100, "volume_24h": 100, "market_cap": 100}}
-        },
-        raw_data={}
+        }
     )
     if norm_unified and norm_unified.symbol == "BTC":
         print("PASS: btc-bitcoin -> BTC")